@@ -18,17 +18,13 @@ class NewsCategoryAdmin(TranslationAdmin):
     list_display_links = list_display
     search_fields = ('name',)
     list_filter = ('created_at',)
+    @admin.display(ordering='news_count')
     def news_count(self, obj):
         url = (
             reverse('admin:common_news_changelist') + '?'
             + urlencode({'category__id': obj.id})
         )
         return format_html('<a href="{}">{} news</a>', url, obj.news_count) 
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(
-            news_count=Count('news')
-        )
 
 class NewsMediaInline(admin.TabularInline):
     model = models.NewsMedia
@@ -51,23 +47,18 @@ class NewsAdmin(TranslationAdmin):
 class PlayerCountryAdmin(admin.ModelAdmin):
     list_display = ('name', 'players_this_country', 'image')
     search_fields = ('name',)
-    @admin.display(ordering='-players_this_country')
+    @admin.display(ordering='-players_count')
     def players_this_country(self, obj):
         url = (
             reverse('admin:common_players_changelist') + '?'
             + urlencode({'country__id': obj.id})
         )
-        return format_html('<a href="{}">{} players</a>', url, obj.players_this_country) 
+        return format_html('<a href="{}">{} players</a>', url, obj.players_count) 
     
     def image(self, obj):
         if obj.flag.name != '':
             return format_html(f'<img src="{obj.flag.url}" alt="flag image" style="width: 100px"/>')
         return ''
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).annotate(
-            players_this_country=Count('players')
-        )
 
 
 @admin.register(models.Players)
@@ -176,4 +167,18 @@ class CoachInformationAdmin(TranslationAdmin):
 @admin.register(models.Leaders)
 class LeaderAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'position', 'country', 'birth_date')
-    search_fields = ('full_name', 'position', 'country')
\ No newline at end of file
+    search_fields = ('full_name', 'position', 'country')
+
+@admin.register(models.Match)
+class MatchAdmin(admin.ModelAdmin):
+    # rows come from the PFL calendar, see common.matches
+    list_display = ('kickoff', 'home_team', 'home_score', 'away_score', 'away_team', 'round', 'finished')
+    list_filter = ('season_id', 'finished')
+    search_fields = ('home_team', 'away_team')
+    ordering = ('-kickoff',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
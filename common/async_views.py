@@ -0,0 +1,79 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from common import home, pfl, search, serializers
+
+
+class AsyncApiView(View):
+    """
+    Plain async Django view for I/O-bound endpoints: DRF's APIView is sync
+    only, so these answer with JsonResponse and never hold a worker thread
+    while the cache, the database or pfl.uz is answering.
+    """
+    http_method_names = ['get', 'post', 'options']
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def response(self, data, status=200):
+        return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+class SnapshotView(AsyncApiView):
+    snapshot_name = None
+    unavailable_message = None
+
+    async def get(self, request):
+        snapshot = await pfl.aget_snapshot(self.snapshot_name)
+        if snapshot is None:
+            return self.response({"message": self.unavailable_message}, status=503)
+        return self.response(snapshot['data'])
+
+
+class TableView(SnapshotView):
+    snapshot_name = pfl.TABLE
+    unavailable_message = "Table is not available yet"
+
+
+class MatchesView(SnapshotView):
+    snapshot_name = pfl.CALENDAR
+    unavailable_message = "Calendar is not available yet"
+
+
+class SearchView(AsyncApiView):
+    async def post(self, request):
+        try:
+            data = json.loads(request.body or b'{}') if request.content_type == 'application/json' else request.POST
+        except ValueError:
+            return self.response({"detail": "JSON parse error"}, status=400)
+        return await self.search(data)
+
+    async def get(self, request):
+        # the GET form can be cached by browsers and nginx, POST stays for older clients
+        response = await self.search(request.GET)
+        if response.status_code == 200:
+            patch_cache_control(response, public=True, max_age=settings.SEARCH_CACHE_MAX_AGE)
+            patch_vary_headers(response, ('Accept-Language', 'Cookie'))
+        return response
+
+    async def search(self, data):
+        serializer = serializers.SearchSerializer(data=data)
+        if not serializer.is_valid():
+            return self.response(serializer.errors, status=400)
+        text = search.normalize_query(serializer.validated_data['search'])
+        results = await search.acached_search(text)
+        await sync_to_async(search.track_query)(text, results)
+        return self.response(results)
+
+
+class HomeView(AsyncApiView):
+    async def get(self, request):
+        return self.response(await home.aget_home())
@@ -0,0 +1,178 @@
+import json
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django_redis import get_redis_connection
+
+from common import localization, models
+from common.text import normalize
+
+INDEX_KEY = 'autocomplete:index'
+DOCS_KEY = 'autocomplete:docs'
+
+# members are "<term><SEPARATOR><kind>:<pk>"; the separator sorts before every
+# printable character, so an exact term comes before longer terms sharing its prefix
+SEPARATOR = '\x01'
+
+# kind -> (model, indexed text fields, stored fields)
+SOURCES = {
+    'news': (models.News, ('title_uz', 'title_ru', 'title_en'), ('slug', 'title_uz', 'title_ru', 'title_en', 'image')),
+    'players': (models.Players, ('full_name',), ('full_name', 'number', 'image')),
+    'coaches': (models.Coach, ('full_name',), ('full_name', 'image')),
+    'leaders': (models.Leaders, ('full_name',), ('full_name', 'image')),
+}
+
+
+def _connection():
+    return get_redis_connection('default')
+
+
+def kind_of(model):
+    return next((kind for kind, source in SOURCES.items() if source[0] is model), None)
+
+
+def _terms(text):
+    # every word start is a term, so "karimov" finds "Aziz Karimov"
+    words = normalize(text).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+def _doc_id(kind, pk):
+    return f'{kind}:{pk}'
+
+
+def _members_key(doc_id):
+    return f'autocomplete:members:{doc_id}'
+
+
+def _document(kind, instance):
+    model, indexed, stored = SOURCES[kind]
+    doc = {'type': kind, 'id': str(instance.pk)}
+    for field in stored:
+        value = getattr(instance, field)
+        doc[field] = (value.name or None) if field == 'image' else value
+    members = {
+        f'{term}{SEPARATOR}{_doc_id(kind, instance.pk)}'
+        for field in indexed for term in _terms(getattr(instance, field) or '')
+    }
+    return doc, members
+
+
+def _write(pipe, kind, instance, old_members=(), index_key=INDEX_KEY, docs_key=DOCS_KEY):
+    doc_id = _doc_id(kind, instance.pk)
+    doc, members = _document(kind, instance)
+    stale = set(old_members) - members
+    if stale:
+        pipe.zrem(index_key, *stale)
+        pipe.srem(_members_key(doc_id), *stale)
+    if members:
+        pipe.zadd(index_key, {member: 0 for member in members})
+        pipe.sadd(_members_key(doc_id), *members)
+    pipe.hset(docs_key, doc_id, json.dumps(doc))
+
+
+def update(instance):
+    kind = kind_of(type(instance))
+    if kind is None:
+        return
+    connection = _connection()
+    old_members = [member.decode() for member in connection.smembers(_members_key(_doc_id(kind, instance.pk)))]
+    with connection.pipeline() as pipe:
+        _write(pipe, kind, instance, old_members)
+        pipe.execute()
+
+
+def remove(model, pk):
+    kind = kind_of(model)
+    if kind is None:
+        return
+    connection = _connection()
+    doc_id = _doc_id(kind, pk)
+    members = connection.smembers(_members_key(doc_id))
+    with connection.pipeline() as pipe:
+        if members:
+            pipe.zrem(INDEX_KEY, *members)
+        pipe.delete(_members_key(doc_id))
+        pipe.hdel(DOCS_KEY, doc_id)
+        pipe.execute()
+
+
+def _drop_orphaned_members(connection, batch_size):
+    keys = list(connection.scan_iter('autocomplete:members:*', count=batch_size))
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        doc_ids = [key.decode().split(':', 2)[2] for key in batch]
+        exists = connection.hmget(DOCS_KEY, doc_ids) if doc_ids else []
+        orphans = [key for key, doc in zip(batch, exists) if doc is None]
+        if orphans:
+            connection.delete(*orphans)
+
+
+def rebuild(batch_size=1000):
+    """
+    Fills fresh keys and renames them over the live index at the end, so suggestions keep working meanwhile.
+    """
+    connection = _connection()
+    suffix = uuid.uuid4().hex
+    index_key, docs_key = f'{INDEX_KEY}:{suffix}', f'{DOCS_KEY}:{suffix}'
+    count = 0
+    try:
+        for kind, (model, indexed, stored) in SOURCES.items():
+            queryset = model.objects.only('id', *indexed, *stored).order_by()
+            with connection.pipeline(transaction=False) as pipe:
+                for instance in queryset.iterator(chunk_size=batch_size):
+                    # replaced per document; terms they drop only linger in the old index until the rename
+                    pipe.delete(_members_key(_doc_id(kind, instance.pk)))
+                    _write(pipe, kind, instance, index_key=index_key, docs_key=docs_key)
+                    count += 1
+                    if len(pipe) >= batch_size * 5:
+                        pipe.execute()
+                pipe.execute()
+
+        with connection.pipeline() as pipe:
+            # RENAME of a key that was never created fails, an empty source empties the live key instead
+            for new, live in ((index_key, INDEX_KEY), (docs_key, DOCS_KEY)):
+                if connection.exists(new):
+                    pipe.rename(new, live)
+                else:
+                    pipe.delete(live)
+            pipe.execute()
+    finally:
+        connection.delete(index_key, docs_key)
+    _drop_orphaned_members(connection, batch_size)
+    return count
+
+
+def _image_url(name, request):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def suggest(text, limit=None, request=None):
+    """
+    Documents whose indexed text has a word starting with ``text``; Redis only, no database.
+    """
+    limit = limit or settings.AUTOCOMPLETE_LIMIT
+    prefix = normalize(text)
+    if len(prefix) < settings.AUTOCOMPLETE_MIN_LENGTH:
+        return []
+
+    connection = _connection()
+    # several terms of one document can match, so read a few more members than needed
+    prefix = prefix.encode()
+    members = connection.zrangebylex(INDEX_KEY, b'[' + prefix, b'[' + prefix + b'\xff', start=0, num=limit * 4)
+    doc_ids = list(dict.fromkeys(member.decode().rsplit(SEPARATOR, 1)[1] for member in members))[:limit]
+    if not doc_ids:
+        return []
+
+    results = []
+    for raw in connection.hmget(DOCS_KEY, doc_ids):
+        if raw is None:
+            continue
+        doc = json.loads(raw)
+        doc['image'] = _image_url(doc.get('image'), request)
+        results.append(localization.localize_dict(doc))
+    return results
@@ -0,0 +1,143 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from common import localization, routers, singleflight
+
+VERSION_KEY_PREFIX = 'model_version'
+CHANGED_KEY_PREFIX = 'model_changed'
+
+
+def _version_key(model):
+    return f'{VERSION_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def _changed_key(model):
+    return f'{CHANGED_KEY_PREFIX}:{model._meta.label_lower}'
+
+
+def _initial_version():
+    # a fresh counter starts from the clock, so an evicted counter can never
+    # fall back onto a version that still has responses cached under it
+    return int(time.time() * 1000)
+
+
+def get_model_state(*model_list):
+    """
+    Returns the version of every model and the time the newest of them changed,
+    read in a single cache round trip.
+    """
+    version_keys = [_version_key(model) for model in model_list]
+    changed_keys = [_changed_key(model) for model in model_list]
+    values = cache.get_many(version_keys + changed_keys)
+
+    now = time.time()
+    missing = {}
+    for version_key, changed_key in zip(version_keys, changed_keys):
+        if version_key not in values:
+            missing[version_key] = _initial_version()
+            missing[changed_key] = now
+        elif changed_key not in values:
+            missing[changed_key] = now
+    if missing:
+        cache.set_many(missing, timeout=None)
+        values.update(missing)
+
+    versions = [values[key] for key in version_keys]
+    last_modified = max(values[key] for key in changed_keys) if changed_keys else now
+    routers.pin_primary_if_changed(last_modified)
+    return versions, last_modified
+
+
+def get_model_versions(*model_list):
+    return get_model_state(*model_list)[0]
+
+
+def bump_model_version(model):
+    key = _version_key(model)
+    cache.set(_changed_key(model), time.time(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def build_response_key(request, key_prefix, versions):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    versions = '.'.join(str(version) for version in versions)
+    return f'response:{key_prefix}:{localization.get_cache_language()}:{url}:{versions}'
+
+
+def cache_response(*model_list, timeout=None, key_prefix='view', time_bucket=None):
+    """
+    Caches successful GET responses until one of ``model_list`` changes.
+    Use it like ``cache_page``: ``@method_decorator(cache_response(...))``.
+
+    The same versions give every response an ETag and Last-Modified, so
+    a matching If-None-Match/If-Modified-Since gets a 304 before the view runs.
+    Views whose output also depends on the clock pass ``time_bucket`` seconds,
+    which start a new version, ETag and Last-Modified every bucket.
+    """
+    if timeout is None:
+        timeout = settings.CACHE_RESPONSE_TIMEOUT
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            versions, last_modified = get_model_state(*model_list)
+            if time_bucket:
+                bucket = int(time.time() // time_bucket)
+                versions = [*versions, f't{bucket}']
+                last_modified = max(last_modified, bucket * time_bucket)
+            key = build_response_key(request, key_prefix, versions)
+            etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+            # HTTP dates have whole seconds: a change later in the same second would keep the same
+            # Last-Modified, so it is only sent once that second is over, and rounded up to its end
+            modified = math.ceil(last_modified)
+            if modified > time.time():
+                modified = None
+
+            not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+            if not_modified is not None:
+                not_modified['ETag'] = etag
+                return not_modified
+
+            rendered = []
+
+            def render():
+                rendered.append(view_func(request, *args, **kwargs))
+                return rendered[0].data if rendered[0].status_code == status.HTTP_200_OK else None
+
+            # after a version bump every concurrent request misses at once, only one of them runs the view
+            data, fresh = singleflight.get_or_set(
+                key, render, timeout, stale_key=build_response_key(request, key_prefix, ['latest']), name=key_prefix,
+            )
+            if rendered and rendered[0].status_code != status.HTTP_200_OK:
+                return rendered[0]
+            response = rendered[0] if rendered else Response(data, status=status.HTTP_200_OK)
+
+            if fresh:
+                # the previous version's body must not be revalidated under the new ETag
+                response['ETag'] = etag
+                if modified is not None:
+                    response['Last-Modified'] = http_date(modified)
+            patch_cache_control(response, no_cache=True)
+            # LocaleMiddleware also reads the language cookie; ?lang= is part of the URL and the key already
+            patch_vary_headers(response, ('Accept-Language', 'Cookie'))
+            return response
+        return wrapper
+    return decorator
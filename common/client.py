@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# sent after every upstream call with name, url, latency, status_code and error
+upstream_request = Signal()
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+def is_failure(status_code):
+    # the upstream is down or throttling us, unlike a 404 for a path we got wrong
+    return status_code >= 500 or status_code == 429
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Shared through the cache, so every worker stops calling a failing
+    upstream once ``failure_threshold`` calls in a row have failed.
+
+    After ``reset_timeout`` the breaker is half-open: calls go through again,
+    the first success closes it and the first failure opens it at once.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    def _key(self, suffix):
+        return f'circuit:{self.name}:{suffix}'
+
+    def is_open(self):
+        return cache.get(self._key('open')) is not None
+
+    async def ais_open(self):
+        return await cache.aget(self._key('open')) is not None
+
+    def record_success(self):
+        cache.delete_many([self._key('failures'), self._key('tripped')])
+
+    async def arecord_success(self):
+        await cache.adelete_many([self._key('failures'), self._key('tripped')])
+
+    def record_failure(self):
+        key = self._key('failures')
+        cache.add(key, 0, self.reset_timeout)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            failures = 1
+            cache.set(key, failures, self.reset_timeout)
+        if failures >= self.failure_threshold or cache.get(self._key('tripped')) is not None:
+            cache.set(self._key('open'), 1, self.reset_timeout)
+            # outlives the open key, so the trial calls after the cooldown know they are trials
+            cache.set(self._key('tripped'), 1, self.reset_timeout * 10)
+            cache.delete(key)
+            logger.warning('circuit %s opened for %ss', self.name, self.reset_timeout)
+
+    async def arecord_failure(self):
+        await sync_to_async(self.record_failure)()
+
+
+class BaseUpstreamClient:
+    def __init__(self, name, base_url, connect_timeout=3, read_timeout=10, retries=2,
+                 backoff=0.5, failure_threshold=5, reset_timeout=60, pool_size=10):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+
+    def _delay(self, attempt):
+        # full jitter keeps retrying workers from hitting the upstream in lockstep
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    def _log(self, url, latency, status_code, error):
+        logger.info('upstream %s GET %s status=%s latency=%.3fs', self.name, url, status_code, latency)
+        return dict(
+            sender=self.__class__, name=self.name, url=url, latency=latency,
+            status_code=status_code, error=error,
+        )
+
+
+class UpstreamClient(BaseUpstreamClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def _send(self, url, **kwargs):
+        start = time.perf_counter()
+        response, error = None, None
+        try:
+            response = self.session.get(url, timeout=(self.connect_timeout, self.read_timeout), **kwargs)
+            return response
+        except requests.RequestException as e:
+            error = e
+            raise
+        finally:
+            status_code = response.status_code if response is not None else None
+            upstream_request.send(**self._log(url, time.perf_counter() - start, status_code, error))
+
+    def get(self, path, **kwargs):
+        if self.breaker.is_open():
+            raise CircuitOpenError(f'{self.name} circuit is open')
+
+        url = f'{self.base_url}{path}'
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = self._send(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise UpstreamError(f'{self.name} is unreachable: {e}') from e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if last_attempt:
+                    self.breaker.record_failure()
+                    raise UpstreamError(f'{self.name} responded with {response.status_code}')
+            time.sleep(self._delay(attempt))
+
+        if response.status_code >= 400:
+            if is_failure(response.status_code):
+                self.breaker.record_failure()
+            raise UpstreamError(f'{self.name} responded with {response.status_code}')
+        self.breaker.record_success()
+        return response
+
+
+class AsyncUpstreamClient(BaseUpstreamClient):
+    """
+    The same retry and breaker policy over a pooled ``httpx.AsyncClient``,
+    for async views that must not hold a worker while the upstream answers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # an httpx client is bound to the event loop it was created on
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def _send(self, url, **kwargs):
+        start = time.perf_counter()
+        response, error = None, None
+        try:
+            response = await self.client.get(url, **kwargs)
+            return response
+        except httpx.HTTPError as e:
+            error = e
+            raise
+        finally:
+            status_code = response.status_code if response is not None else None
+            await upstream_request.asend(**self._log(url, time.perf_counter() - start, status_code, error))
+
+    async def get(self, path, **kwargs):
+        if await self.breaker.ais_open():
+            raise CircuitOpenError(f'{self.name} circuit is open')
+
+        url = f'{self.base_url}{path}'
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self._send(url, **kwargs)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    await self.breaker.arecord_failure()
+                    raise UpstreamError(f'{self.name} is unreachable: {e}') from e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                if last_attempt:
+                    await self.breaker.arecord_failure()
+                    raise UpstreamError(f'{self.name} responded with {response.status_code}')
+            await asyncio.sleep(self._delay(attempt))
+
+        if response.status_code >= 400:
+            if is_failure(response.status_code):
+                await self.breaker.arecord_failure()
+            raise UpstreamError(f'{self.name} responded with {response.status_code}')
+        await self.breaker.arecord_success()
+        return response
+
+
+_clients = {}
+
+
+def _pfl_options():
+    return dict(
+        connect_timeout=settings.PFL_CONNECT_TIMEOUT,
+        read_timeout=settings.PFL_READ_TIMEOUT,
+        retries=settings.PFL_RETRIES,
+        failure_threshold=settings.PFL_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.PFL_CIRCUIT_RESET_TIMEOUT,
+    )
+
+
+def get_pfl_client():
+    if 'pfl' not in _clients:
+        _clients['pfl'] = UpstreamClient('pfl', settings.PFL_BASE_URL, **_pfl_options())
+    return _clients['pfl']
+
+
+def get_async_pfl_client():
+    if 'pfl_async' not in _clients:
+        _clients['pfl_async'] = AsyncUpstreamClient('pfl', settings.PFL_BASE_URL, **_pfl_options())
+    return _clients['pfl_async']
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from common import models
+from common.cache import bump_model_version
+
+# (counted model, foreign key to the parent, counter column on the parent)
+COUNTERS = (
+    (models.News, 'category', 'news_count'),
+    (models.Players, 'country', 'players_count'),
+)
+
+
+def _counters(model):
+    return [(field, counter) for counted, field, counter in COUNTERS if counted is model]
+
+
+def _parent(model, field):
+    return model._meta.get_field(field).related_model
+
+
+def _change(model, field, counter, pk, delta):
+    if pk is not None:
+        # F() keeps concurrent saves from losing each other's increments; a counter that
+        # drifted low stops at 0 instead of failing the delete, reconcile_counters fixes it
+        _parent(model, field).objects.filter(pk=pk).update(**{counter: Greatest(F(counter) + delta, 0)})
+
+
+def _bump_parents(model):
+    # after the commit, like the other version bumps, so a rebuild cannot cache the old counts
+    for field, counter in _counters(model):
+        parent = _parent(model, field)
+        transaction.on_commit(lambda parent=parent: bump_model_version(parent))
+
+
+def remember_parents(instance):
+    """
+    Called before save: a row moving to another parent decrements the old one.
+    """
+    fields = _counters(type(instance))
+    if not fields or instance._state.adding:
+        return
+    old = type(instance).objects.filter(pk=instance.pk).values(*[f'{field}_id' for field, counter in fields]).first()
+    instance._counted_parents = old or {}
+
+
+def saved(instance, created):
+    model = type(instance)
+    changed = False
+    for field, counter in _counters(model):
+        new = getattr(instance, f'{field}_id')
+        old = None if created else getattr(instance, '_counted_parents', {}).get(f'{field}_id', new)
+        if old == new:
+            continue
+        _change(model, field, counter, old, -1)
+        _change(model, field, counter, new, 1)
+        changed = True
+    if changed:
+        # update() skips post_save, so cached responses showing the counts are invalidated by hand
+        _bump_parents(model)
+
+
+def deleted(instance):
+    model = type(instance)
+    for field, counter in _counters(model):
+        _change(model, field, counter, getattr(instance, f'{field}_id'), -1)
+    _bump_parents(model)
+
+
+def reconcile(fix=True):
+    """
+    Recounts every counter from the rows. Returns ``[(parent model, counter, pk, stored, actual)]`` for drifted rows.
+    """
+    drift = []
+    for model, field, counter in COUNTERS:
+        parent = _parent(model, field)
+        actual = Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+            .annotate(count=Count('pk')).values('count')
+        )
+        rows = parent.objects.annotate(actual=Coalesce(actual, 0)).exclude(**{counter: F('actual')})
+        for pk, stored, count in rows.values_list('pk', counter, 'actual'):
+            drift.append((parent, counter, pk, stored, count))
+            if fix:
+                parent.objects.filter(pk=pk).update(**{counter: count})
+        if fix and any(row[0] is parent for row in drift):
+            bump_model_version(parent)
+    return drift
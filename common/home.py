@@ -0,0 +1,118 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import translation
+
+from common import localization, models, pfl, serializers, singleflight
+from common.cache import get_model_state
+
+logger = logging.getLogger(__name__)
+
+# shared on purpose: a fragment that misses the deadline keeps running here
+# and fills its cache entry for the next request instead of blocking this one
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='home')
+
+
+def build_banners():
+    queryset = models.Banner.objects.all().order_by('created_at')
+    return serializers.BannerListSerializer(queryset, many=True).data
+
+
+def build_partners():
+    queryset = models.Partners.objects.all().order_by('created_at')
+    return serializers.PartnerLogoListSerializer(queryset, many=True).data
+
+
+def build_latest_news():
+    queryset = models.News.objects.order_by('-created_at')[:settings.HOME_NEWS_LIMIT]
+    return serializers.NewsSerializer(queryset, many=True).data
+
+
+FRAGMENTS = {
+    'banners': (build_banners, (models.Banner,)),
+    'partners': (build_partners, (models.Partners,)),
+    'news': (build_latest_news, (models.News, models.NewsCategory)),
+}
+
+
+def _fragment_key(name, lang, versions):
+    return f'home:{name}:{lang}:{".".join(str(version) for version in versions)}'
+
+
+def _build(name, key, lang):
+    build = FRAGMENTS[name][0]
+
+    def compute():
+        with translation.override(lang):
+            return {'data': build(), 'updated_at': time.time(), 'stale': False}
+
+    try:
+        # the key without its versions keeps the last fragment built, served while another worker rebuilds
+        fragment, fresh = singleflight.get_or_set(
+            key, compute, settings.CACHE_RESPONSE_TIMEOUT, stale_key=f'{key.rsplit(":", 1)[0]}:latest', name=f'home:{name}',
+        )
+        return fragment if fresh else {**fragment, 'stale': True}
+    finally:
+        connections.close_all()
+
+
+def _snapshot_fragment(name, snapshot):
+    if snapshot is None:
+        return _missing()
+    return {'data': snapshot['data'], 'updated_at': snapshot['fetched_at'], 'stale': pfl.is_stale(name, snapshot)}
+
+
+def _missing():
+    return {'data': None, 'updated_at': None, 'stale': True}
+
+
+def _fragment_keys():
+    all_models = [model for build, model_list in FRAGMENTS.values() for model in model_list]
+    versions = dict(zip(all_models, get_model_state(*all_models)[0]))
+    return {
+        name: _fragment_key(name, localization.get_cache_language(), [versions[model] for model in model_list])
+        for name, (build, model_list) in FRAGMENTS.items()
+    }
+
+
+def _result(name, future, done):
+    if future in done and future.exception() is None:
+        return future.result()
+    if future in done:
+        logger.error('home fragment %s failed', name, exc_info=future.exception())
+    return _missing()
+
+
+async def _asnapshot_fragment(name):
+    return _snapshot_fragment(name, await pfl.aget_snapshot(name))
+
+
+async def aget_home():
+    lang = translation.get_language()
+    keys = await sync_to_async(_fragment_keys)()
+    fragments = await cache.aget_many(keys.values())
+
+    loop = asyncio.get_running_loop()
+    data = {}
+    futures = {
+        asyncio.ensure_future(_asnapshot_fragment(pfl.TABLE)): 'table',
+        asyncio.ensure_future(_asnapshot_fragment(pfl.CALENDAR)): 'matches',
+    }
+    for name, key in keys.items():
+        if key in fragments:
+            data[name] = fragments[key]
+        else:
+            future = loop.run_in_executor(executor, contextvars.copy_context().run, _build, name, key, lang)
+            futures[future] = name
+
+    done, not_done = await asyncio.wait(futures, timeout=settings.HOME_FRAGMENT_TIMEOUT)
+    for future, name in futures.items():
+        data[name] = _result(name, future, done)
+    return data
@@ -0,0 +1,93 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def _derivative_name(name, width, extension):
+    directory, filename = os.path.split(name)
+    stem, source_extension = os.path.splitext(filename)
+    # logo.png and logo.jpg in one directory must not share derivatives
+    return os.path.join('derivatives', directory, f'{stem}_{source_extension.lstrip(".")}_{width}.{extension}')
+
+
+def _has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+
+
+def _flatten(image):
+    # JPEG has no alpha, transparent logos go onto white rather than black
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def generate_derivatives(field_file):
+    """
+    Renders every configured width of ``field_file`` as WebP and JPEG, WebP keeping transparency.
+    Pillow writes no EXIF unless asked to, so the derivatives come out stripped.
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if _has_alpha(image) else 'RGB')
+
+    sizes = {}
+    for width in settings.IMAGE_DERIVATIVE_WIDTHS:
+        if width > image.width and sizes:
+            break
+        width = min(width, image.width)
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        sizes[str(width)] = {}
+        for fmt, (pil_format, extension) in FORMATS.items():
+            output = _flatten(resized) if pil_format == 'JPEG' and resized.mode == 'RGBA' else resized
+            buffer = BytesIO()
+            output.save(buffer, pil_format, quality=settings.IMAGE_DERIVATIVE_QUALITY, optimize=True)
+            name = _derivative_name(field_file.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            sizes[str(width)][fmt] = storage.save(name, ContentFile(buffer.getvalue()))
+    return {'source': field_file.name, 'sizes': sizes}
+
+
+def _names(entry):
+    return {name for formats in (entry or {}).get('sizes', {}).values() for name in formats.values()}
+
+
+def delete_stale_derivatives(old, new, storage):
+    """
+    Deletes the files of the ``old`` derivatives entry that ``new`` no longer uses.
+    """
+    for name in _names(old) - _names(new):
+        storage.delete(name)
+
+
+def needs_derivatives(instance):
+    for field_name in instance.derivative_fields:
+        name = getattr(instance, field_name).name or None
+        if name != instance.derivatives.get(field_name, {}).get('source'):
+            return True
+    return False
+
+
+def build_srcset(derivatives, field_name, storage, request=None):
+    sizes = (derivatives or {}).get(field_name, {}).get('sizes', {})
+    srcset = {}
+    for fmt in FORMATS:
+        entries = []
+        for width in sorted(sizes, key=int):
+            url = storage.url(sizes[width][fmt])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            entries.append(f'{url} {width}w')
+        srcset[fmt] = ', '.join(entries)
+    return srcset
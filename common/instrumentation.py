@@ -0,0 +1,146 @@
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django_redis.cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+_metrics = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    """
+    Time and call counts per phase of one request. Pool threads started
+    with a copied context (home fragments, sync_to_async) record here too.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.durations = {'db': 0.0, 'cache': 0.0, 'pfl': 0.0}
+        self.counts = {'db': 0, 'cache_hits': 0, 'cache_misses': 0, 'pfl': 0}
+
+    def record(self, phase, duration, **counts):
+        with self._lock:
+            self.durations[phase] = self.durations.get(phase, 0) + duration
+            for name, count in counts.items():
+                self.counts[name] = self.counts.get(name, 0) + count
+
+    def server_timing(self, total):
+        app = max(total - sum(self.durations.values()), 0)
+        parts = [
+            f'db;dur={self.durations["db"] * 1000:.1f};desc="{self.counts["db"]} queries"',
+            f'cache;dur={self.durations["cache"] * 1000:.1f};'
+            f'desc="{self.counts["cache_hits"]} hits {self.counts["cache_misses"]} misses"',
+            f'pfl;dur={self.durations["pfl"] * 1000:.1f};desc="{self.counts["pfl"]} calls"',
+            f'app;dur={app * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        return ', '.join(parts)
+
+
+def start():
+    return _metrics.set(RequestMetrics())
+
+
+def stop(token):
+    _metrics.reset(token)
+
+
+def current():
+    return _metrics.get()
+
+
+def record(phase, duration, **counts):
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.record(phase, duration, **counts)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record('db', time.perf_counter() - start, db=1)
+
+
+def get_query_budget(request):
+    match = getattr(request, 'resolver_match', None)
+    view_class = getattr(match.func, 'view_class', None) if match else None
+    return getattr(view_class, 'query_budget', settings.QUERY_BUDGET_DEFAULT), view_class
+
+
+def check_query_budget(request, metrics):
+    budget, view_class = get_query_budget(request)
+    if budget is None or metrics.counts['db'] <= budget:
+        return
+    message = f'{view_class.__name__ if view_class else request.path} ran {metrics.counts["db"]} queries, budget is {budget}'
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def log_request(request, response, metrics, total):
+    match = getattr(request, 'resolver_match', None)
+    logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'total_ms': round(total * 1000, 1),
+        **{f'{phase}_ms': round(duration * 1000, 1) for phase, duration in metrics.durations.items()},
+        **metrics.counts,
+    }))
+
+
+class InstrumentedCacheMixin:
+    """
+    Times cache calls and counts hits and misses for the current request.
+    The async methods of BaseCache run these through sync_to_async, so they are counted too.
+    """
+
+    def get(self, key, default=None, version=None, **kwargs):
+        start = time.perf_counter()
+        value = super().get(key, _MISSING, version=version, **kwargs)
+        hit = value is not _MISSING
+        record('cache', time.perf_counter() - start, cache_hits=int(hit), cache_misses=int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, version=None, **kwargs):
+        keys = list(keys)
+        start = time.perf_counter()
+        values = super().get_many(keys, version=version, **kwargs)
+        record('cache', time.perf_counter() - start, cache_hits=len(values), cache_misses=len(keys) - len(values))
+        return values
+
+    def _timed(name):
+        def method(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return getattr(super(InstrumentedCacheMixin, self), name)(*args, **kwargs)
+            finally:
+                record('cache', time.perf_counter() - start)
+        method.__name__ = name
+        return method
+
+    set = _timed('set')
+    set_many = _timed('set_many')
+    add = _timed('add')
+    delete = _timed('delete')
+    incr = _timed('incr')
+    del _timed
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
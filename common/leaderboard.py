@@ -0,0 +1,93 @@
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from common import models
+
+ALL = 'all'
+
+# stat name -> score of a player, None keeps the player off that board
+STATS = {
+    'goals': lambda player: player.goal,
+    'assists': lambda player: player.assist,
+    'contributions': lambda player: player.goal + player.assist,
+    'goals_per_match': lambda player: (
+        player.goal / player.match if player.match >= settings.LEADERBOARD_MIN_MATCHES else None
+    ),
+}
+
+
+def _connection():
+    return get_redis_connection('default')
+
+
+def _key(stat, squad):
+    return f'leaderboard:{squad}:{stat}'
+
+
+def _built_key():
+    return 'leaderboard:built'
+
+
+def _squads():
+    return [*models.SQUADS, ALL]
+
+
+def _squad_name(gender):
+    return next(name for name, value in models.SQUADS.items() if value == gender)
+
+
+def _write(pipe, player, clear=True):
+    member = str(player.pk)
+    for stat, score in STATS.items():
+        # a player changing squad leaves the old squad's board in the same transaction
+        for squad in _squads() if clear else ():
+            pipe.zrem(_key(stat, squad), member)
+        value = score(player)
+        if value is None:
+            continue
+        for squad in (_squad_name(player.gender), ALL):
+            pipe.zadd(_key(stat, squad), {member: value})
+
+
+def update_player(player):
+    if not _connection().exists(_built_key()):
+        return rebuild()
+    with _connection().pipeline() as pipe:
+        _write(pipe, player)
+        pipe.execute()
+
+
+def remove_player(pk):
+    with _connection().pipeline() as pipe:
+        for stat in STATS:
+            for squad in _squads():
+                pipe.zrem(_key(stat, squad), str(pk))
+        pipe.execute()
+
+
+def rebuild():
+    """
+    Recomputes every board from the database, for the first read and after bulk updates.
+    """
+    count = 0
+    with _connection().pipeline() as pipe:
+        pipe.delete(*[_key(stat, squad) for stat in STATS for squad in _squads()])
+        for player in models.Players.objects.only('id', 'gender', 'goal', 'assist', 'match').iterator():
+            _write(pipe, player, clear=False)
+            count += 1
+        pipe.set(_built_key(), 1)
+        pipe.execute()
+    return count
+
+
+def top(stat, squad=ALL, limit=10):
+    """
+    The ``limit`` best players of ``squad`` by ``stat`` as ``[(player id, score)]``.
+    """
+    connection = _connection()
+    if not connection.exists(_built_key()):
+        rebuild()
+    return [
+        (member.decode(), score)
+        for member, score in connection.zrevrange(_key(stat, squad), 0, limit - 1, withscores=True)
+    ]
@@ -0,0 +1,110 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import translation
+from modeltranslation.translator import NotRegistered, translator
+from modeltranslation.utils import get_language, resolution_order
+
+# ?translations=all keeps the old response with every <field>_uz/ru/en column
+ALL_LANGUAGES_PARAM = 'translations'
+
+_all_languages = ContextVar('all_languages', default=False)
+
+
+def set_all_languages(value):
+    return _all_languages.set(value)
+
+
+def reset_all_languages(token):
+    _all_languages.reset(token)
+
+
+def is_localized():
+    return not _all_languages.get()
+
+
+def get_cache_language():
+    """
+    The part of a cache key that tells apart responses rendered for different languages.
+    """
+    return translation.get_language() if is_localized() else f'{translation.get_language()}-all'
+
+
+def language_order():
+    return resolution_order(get_language())
+
+
+def language_codes():
+    return [code for code, name in settings.LANGUAGES]
+
+
+def translated_fields(model):
+    try:
+        return translator.get_options_for_model(model).fields
+    except NotRegistered:
+        return ()
+
+
+def unused_columns(model, prefix=''):
+    """
+    Translation columns of ``model`` that the active language and its fallbacks never read.
+    """
+    needed = language_order()
+    return [
+        f'{prefix}{field}_{code}'
+        for field in translated_fields(model)
+        for code in language_codes() if code not in needed
+    ]
+
+
+def defer_unused(queryset, **related):
+    """
+    Defers the translation columns a localized response does not need.
+    ``related`` maps select_related paths to their models, e.g. ``position=models.CoachPosition``.
+    """
+    if not is_localized():
+        return queryset
+    columns = unused_columns(queryset.model)
+    for path, model in related.items():
+        columns += unused_columns(model, prefix=f'{path}__')
+    return queryset.defer(*columns) if columns else queryset
+
+
+def translated_groups(keys):
+    """
+    Finds every ``<base>_uz/ru/en`` group among ``keys``.
+    Returns ``{first key of the group: (base, group keys)}``.
+    """
+    codes = language_codes()
+    groups = {}
+    for key in keys:
+        for code in codes:
+            if not key.endswith(f'_{code}'):
+                continue
+            base = key[:-len(code) - 1]
+            group = [f'{base}_{code}' for code in codes]
+            if all(name in keys for name in group) and not any(name in groups for name in group):
+                groups[key] = (base, group)
+            break
+    return groups
+
+
+def localize_dict(data):
+    """
+    Returns ``data`` with ``<field>_uz/ru/en`` keys collapsed into ``<field>``, nested dicts included.
+    """
+    if not is_localized():
+        return data
+    groups = translated_groups(list(data))
+    grouped = {key for base, group in groups.values() for key in group}
+    result = {}
+    for key, value in data.items():
+        if key in groups:
+            base, group = groups[key]
+            result[base] = next(
+                (data[f'{base}_{code}'] for code in language_order() if data.get(f'{base}_{code}')),
+                data[f'{base}_{get_language()}'],
+            )
+        elif key not in grouped:
+            result[key] = localize_dict(value) if isinstance(value, dict) else value
+    return result
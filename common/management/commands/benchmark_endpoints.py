@@ -0,0 +1,157 @@
+import json
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+
+from common import models, urls
+from common.management.commands.generate_synthetic_data import SCALES
+
+
+def _first(model, field, **filters):
+    return str(model.objects.filter(**filters).values_list(field, flat=True).order_by('created_at').first())
+
+
+# path parameters of common/urls.py routes, read from the generated data
+SAMPLES = {
+    'news/category/<uuid:id>/': lambda: {'id': _first(models.NewsCategory, 'id', news__isnull=False)},
+    'news/<slug:slug>/': lambda: {'slug': _first(models.News, 'slug')},
+    'players/<uuid:id>/': lambda: {'id': _first(models.Players, 'id')},
+    'coach/<uuid:id>/': lambda: {'id': _first(models.Coach, 'id')},
+}
+
+# extra query strings and request bodies worth measuring on top of the bare route
+VARIANTS = {
+    'news/category/<uuid:id>/': ['', '?pagination=page'],
+    'players/': ['?squad=man'],
+    'search/': [{'search': 'xorazm'}, {'search': 'gol fin'}, '?search=xorazm'],
+    'autocomplete/': ['?q=xo'],
+    'matches/results/': ['?limit=10'],
+}
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))] * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures latency, throughput, SQL queries and response size of every common/urls.py endpoint. '
+        'With --scales the data is regenerated before each run, so only use it on a disposable database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', choices=SCALES, help='Regenerate and benchmark at each scale')
+        parser.add_argument('--yes', action='store_true', help='Confirms that --scales may delete the data')
+        parser.add_argument('--requests', type=int, default=50, help='Warm requests per endpoint')
+        parser.add_argument('--output', help='Writes the results as JSON')
+        parser.add_argument('--baseline', help='JSON from an earlier --output run to compare against')
+        parser.add_argument('--tolerance', type=float, default=1.25, help='Allowed p99 ratio over the baseline')
+
+    def _endpoints(self):
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = str(pattern.pattern)
+            if pattern.pattern.converters and route not in SAMPLES:
+                self.stderr.write(f'skipped {route}: add its parameters to SAMPLES')
+                continue
+            kwargs = SAMPLES[route]() if route in SAMPLES else {}
+            path = '/api/v1/common/' + re.sub(r'<(?:\w+:)?(\w+)>', lambda match: kwargs[match.group(1)], route)
+            for variant in VARIANTS.get(route, ['']):
+                if isinstance(variant, dict):
+                    yield f'POST {route} {variant}', 'post', path, variant
+                else:
+                    yield f'GET {route}{variant}', 'get', path + variant, None
+
+    def _request(self, client, method, path, body):
+        if method == 'post':
+            return client.post(path, body, content_type='application/json')
+        return client.get(path)
+
+    def _measure(self, client, method, path, body, requests):
+        cache.clear()
+        with CaptureQueriesContext(connection) as cold:
+            response = self._request(client, method, path, body)
+        if response.status_code != 200:
+            return {'status': response.status_code}
+
+        latencies = []
+        with CaptureQueriesContext(connection) as warm:
+            for _ in range(requests):
+                start = time.perf_counter()
+                self._request(client, method, path, body)
+                latencies.append(time.perf_counter() - start)
+        return {
+            'status': response.status_code,
+            'bytes': len(response.content),
+            'cold_queries': len(cold),
+            'warm_queries': len(warm) // requests,
+            'p50': _percentile(latencies, 50),
+            'p99': _percentile(latencies, 99),
+            'rps': requests / sum(latencies),
+        }
+
+    def _run(self, requests):
+        # the test client's "testserver" host is not in ALLOWED_HOSTS and would only measure 400s
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0], raise_request_exception=False)
+        results = {}
+        for name, method, path, body in self._endpoints():
+            results[name] = result = self._measure(client, method, path, body, requests)
+            if 'p50' not in result:
+                self.stdout.write(self.style.ERROR(f'{name:<48} status={result["status"]}'))
+                self.failed.append(name)
+                continue
+            self.stdout.write(
+                f'{name:<48} p50={result["p50"]:>7.1f}ms p99={result["p99"]:>7.1f}ms '
+                f'rps={result["rps"]:>7.0f} queries={result["cold_queries"]}/{result["warm_queries"]} '
+                f'size={result["bytes"]}'
+            )
+        return results
+
+    def _regressions(self, results, baseline):
+        for scale, endpoints in results.items():
+            for name, result in endpoints.items():
+                before = baseline.get(scale, {}).get(name)
+                if not before or 'p99' not in before or 'p99' not in result:
+                    continue
+                if result['p99'] > before['p99'] * self.tolerance:
+                    yield f'{scale} {name}: p99 {before["p99"]:.1f}ms -> {result["p99"]:.1f}ms'
+                if result['cold_queries'] > before['cold_queries']:
+                    yield f'{scale} {name}: queries {before["cold_queries"]} -> {result["cold_queries"]}'
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive')
+        if options['scales'] and not options['yes']:
+            raise CommandError('--scales deletes and regenerates the data, add --yes if this database is disposable')
+        self.tolerance = options['tolerance']
+        self.failed = []
+
+        results = {}
+        for scale in options['scales'] or ['current']:
+            if scale != 'current':
+                call_command('generate_synthetic_data', scale=scale, clear=True, yes=True, stdout=self.stdout)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{scale} dataset'))
+            results[scale] = self._run(options['requests'])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                regressions = list(self._regressions(results, json.load(f)))
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f'regression {line}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+        if self.failed:
+            raise CommandError(f'{len(self.failed)} endpoints did not answer 200: {", ".join(self.failed)}')
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from common import models, serializers
+
+
+def _news():
+    return models.News.objects.select_related('category').order_by('-created_at')
+
+
+def _coaches():
+    return models.Coach.objects.select_related('position').order_by('created_at')
+
+
+CASES = (
+    ('news list', _news, serializers.NewsSerializer, serializers.NewsValuesSerializer),
+    ('coach list', _coaches, serializers.CoachListSerializer, serializers.CoachListValuesSerializer),
+    ('coach table', _coaches, serializers.CoachTableListSerializer, serializers.CoachTableListValuesSerializer),
+)
+
+
+class Command(BaseCommand):
+    help = 'Compares rows/sec of the ModelSerializer and values() serializer paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows fetched per run')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def _rate(self, func, runs):
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            count = len(func())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return count, count / best if best else 0
+
+    def handle(self, *args, **options):
+        rows, runs = options['rows'], options['runs']
+        # image columns build absolute URLs, which need a host from ALLOWED_HOSTS
+        context = {'request': RequestFactory().get('/', HTTP_HOST=settings.ALLOWED_HOSTS[0])}
+        for name, queryset, model_serializer, values_serializer in CASES:
+            count, model_rate = self._rate(
+                lambda: model_serializer(queryset()[:rows], many=True, context=context).data, runs
+            )
+            _, values_rate = self._rate(
+                lambda: values_serializer(queryset()[:rows], context=context).data, runs
+            )
+            speedup = values_rate / model_rate if model_rate else 0
+            self.stdout.write(
+                f'{name:<12} rows={count:<6} model={model_rate:>10.0f} rows/s '
+                f'values={values_rate:>10.0f} rows/s x{speedup:.1f}'
+            )
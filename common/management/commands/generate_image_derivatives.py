@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from common import images, models
+from common.tasks import generate_image_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Queues derivative generation for images uploaded before the pipeline existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate even up-to-date derivatives')
+
+    def handle(self, *args, **options):
+        queued = 0
+        for model in apps.get_app_config('common').get_models():
+            if not issubclass(model, models.ImageDerivativesModel):
+                continue
+            for instance in model.objects.iterator():
+                if options['all'] or images.needs_derivatives(instance):
+                    generate_image_derivatives.delay(model._meta.label, str(instance.pk))
+                    queued += 1
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} images'))
@@ -0,0 +1,200 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from common import autocomplete, counters, leaderboard, models, search
+from common.cache import bump_model_version
+
+SCALES = {
+    'small': dict(news=1000, categories=5, media=1, players=500, coaches=40, informations=3, matches=60),
+    'medium': dict(news=10000, categories=8, media=2, players=2000, coaches=100, informations=4, matches=120),
+    'large': dict(news=100000, categories=12, media=2, players=5000, coaches=200, informations=5, matches=300),
+}
+
+WORDS = (
+    'xorazm', 'urganch', 'futbol', 'jamoa', 'gʻalaba', 'durang', 'mavsum', 'superliga', 'kubok',
+    'stadion', 'murabbiy', 'himoyachi', 'hujumchi', 'darvozabon', 'akademiya', 'muxlislar',
+    'transfer', 'trening', 'final', 'gol', 'penalti', 'tur', 'match', 'season', 'victory',
+)
+FIRST_NAMES = ('Aziz', 'Bekzod', 'Doston', 'Eldor', 'Jasur', 'Otabek', 'Sardor', 'Shohruh', 'Temur', 'Ulugʻbek')
+LAST_NAMES = ('Abdullayev', 'Ergashev', 'Karimov', 'Matyoqubov', 'Nazarov', 'Rahimov', 'Saidov', 'Yusupov')
+PLAYER_POSITIONS = ('Darvozabon', 'Himoyachi', 'Yarim himoyachi', 'Hujumchi')
+COACH_POSITIONS = ('Bosh murabbiy', 'Murabbiy', 'Darvozabonlar murabbiyi', 'Jismoniy tayyorgarlik murabbiyi')
+COUNTRIES = ('Oʻzbekiston', 'Serbiya', 'Braziliya', 'Ukraina', 'Tojikiston')
+CLUBS = ('Xorazm', 'Paxtakor', 'Navbahor', 'Nasaf', 'Bunyodkor', 'Qizilqum', 'Soʻgʻdiyona', 'Andijon')
+
+# every model the generator fills, children first so --clear can delete in this order
+GENERATED = (
+    models.NewsMedia, models.News, models.NewsCategory,
+    models.Players, models.PlayerPosition, models.PlayerCountry,
+    models.CoachInformation, models.Coach, models.CoachPosition,
+    models.Match,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills the database with synthetic news, players and coaches for benchmarking. '
+        'Only run it against a disposable database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        for name in SCALES['small']:
+            parser.add_argument(f'--{name}', type=int, help=f'Overrides the {name} count of --scale')
+        parser.add_argument('--clear', action='store_true', help='Deletes every row of the generated tables first')
+        parser.add_argument('--yes', action='store_true', help='Confirms --clear')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _sentence(self, words):
+        return ' '.join(random.choice(WORDS) for _ in range(words)).capitalize()
+
+    def _translated(self, field, words):
+        return {f'{field}_{code}': f'{self._sentence(words)} ({code})' for code in ('uz', 'ru', 'en')}
+
+    def _full_name(self):
+        return f'{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}'
+
+    def _create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def _news(self, counts):
+        categories = self._create(models.NewsCategory, [
+            models.NewsCategory(**self._translated('name', 2)) for _ in range(counts['categories'])
+        ])
+        offset = models.News.objects.count()
+        news = []
+        for i in range(offset, offset + counts['news']):
+            title = self._translated('title', 6)
+            # titles and slugs are unique, the counter keeps them so across repeated runs
+            title = {field: f'{value} #{i}' for field, value in title.items()}
+            news.append(models.News(
+                slug=f'synthetic-news-{i}',
+                image=f'synthetic/news/{i}.jpg',
+                category=random.choice(categories),
+                **title,
+                **self._translated('description', 60),
+            ))
+            if len(news) == self.batch_size:
+                self._flush_news(news, counts)
+                news = []
+        self._flush_news(news, counts)
+        search.update_news_search_vector(models.News.objects.filter(search_vector__isnull=True))
+
+    def _flush_news(self, news, counts):
+        # one transaction per batch keeps 100k rows from growing into a single huge one
+        with transaction.atomic():
+            self._create(models.News, news)
+            self._create(models.NewsMedia, [
+                models.NewsMedia(news=item, image=f'synthetic/news_media/{item.slug}-{n}.jpg')
+                for item in news for n in range(counts['media'])
+            ])
+
+    def _players(self, counts):
+        positions = self._create(models.PlayerPosition, [
+            models.PlayerPosition(name_uz=name, name_ru=name, name_en=name) for name in PLAYER_POSITIONS
+        ])
+        countries = self._create(models.PlayerCountry, [
+            models.PlayerCountry(name=name, flag=f'synthetic/flags/{i}.png') for i, name in enumerate(COUNTRIES)
+        ])
+        squads = list(models.SQUADS.values())
+        self._create(models.Players, [
+            models.Players(
+                full_name=self._full_name(),
+                image=f'synthetic/players/{i}.jpg',
+                number=random.randint(1, 99),
+                goal=random.randint(0, 40),
+                match=random.randint(0, 120),
+                assist=random.randint(0, 30),
+                birth_date=date(1990, 1, 1) + timedelta(days=random.randint(0, 12000)),
+                height=f'{random.randint(165, 200)} sm',
+                country=random.choice(countries),
+                gender=random.choice(squads),
+                position=random.choice(positions),
+            )
+            for i in range(counts['players'])
+        ])
+
+    def _coaches(self, counts):
+        positions = self._create(models.CoachPosition, [
+            models.CoachPosition(name_uz=name, name_ru=name, name_en=name) for name in COACH_POSITIONS
+        ])
+        coaches = self._create(models.Coach, [
+            models.Coach(
+                full_name=self._full_name(),
+                image=f'synthetic/coaches/{i}.jpg',
+                position=random.choice(positions),
+                gender=random.choice((models.MAN, models.WOMEN)),
+                coach_type=random.choice((models.TEAM_COACH, models.ACADEMY_COACH)),
+            )
+            for i in range(counts['coaches'])
+        ])
+        self._create(models.CoachInformation, [
+            models.CoachInformation(coach=coach, **self._translated('name', 1), **self._translated('value', 3))
+            for coach in coaches for _ in range(counts['informations'])
+        ])
+
+    def _matches(self, counts):
+        # one game a week, half of them played; ids continue after the highest one so reruns add games
+        first_id = (models.Match.objects.order_by('-pfl_id').values_list('pfl_id', flat=True).first() or 0) + 1
+        start = datetime.now().replace(hour=19, minute=0, second=0, microsecond=0) - timedelta(weeks=counts['matches'] // 2)
+        matches = []
+        for i in range(counts['matches']):
+            kickoff = start + timedelta(weeks=i)
+            finished = kickoff < datetime.now()
+            home, away = random.sample(CLUBS, 2)
+            matches.append(models.Match(
+                pfl_id=first_id + i,
+                tournament_id=settings.PFL_TOURNAMENT_ID,
+                season_id=settings.PFL_SEASON_ID,
+                round=str(i % 30 + 1),
+                kickoff=kickoff,
+                home_team=home,
+                away_team=away,
+                home_score=random.randint(0, 4) if finished else None,
+                away_score=random.randint(0, 4) if finished else None,
+                stadium=f'{home} stadioni',
+                finished=finished,
+            ))
+        self._create(models.Match, matches)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.batch_size = options['batch_size']
+        counts = {name: options[name] if options[name] is not None else value
+                  for name, value in SCALES[options['scale']].items()}
+        if any(value < 0 for value in counts.values()):
+            raise CommandError('Counts must not be negative')
+        if counts['news'] and not counts['categories']:
+            raise CommandError('News need at least one category')
+        if options['clear'] and not options['yes']:
+            raise CommandError(
+                '--clear deletes every news, player, coach and match row, add --yes if this database is disposable'
+            )
+
+        start = time.perf_counter()
+        if options['clear']:
+            for model in GENERATED:
+                model.objects.all().delete()
+        self._news(counts)
+        self._players(counts)
+        self._coaches(counts)
+        self._matches(counts)
+
+        # bulk_create skips the post_save signals that keep counters, rankings, autocomplete and cached responses current
+        counters.reconcile()
+        leaderboard.rebuild()
+        autocomplete.rebuild(self.batch_size)
+        for model in apps.get_app_config('common').get_models():
+            bump_model_version(model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {options["scale"]} dataset in {time.perf_counter() - start:.1f}s: '
+            + ', '.join(f'{name}={value}' for name, value in counts.items())
+        ))
@@ -0,0 +1,41 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common import matches
+
+
+class Command(BaseCommand):
+    help = 'Upserts the PFL calendar of a season into the Match table, e.g. to backfill past seasons'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, action='append', help=f'PFL season id, repeatable (default {settings.PFL_SEASON_ID})')
+        parser.add_argument(
+            '--record', metavar='PATH',
+            help='Also writes the raw calendar response to PATH, e.g. to refresh common/testdata/pfl_calendar.json',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only parses the calendar and reports how many games have the expected shape, writes nothing',
+        )
+
+    def handle(self, *args, **options):
+        seasons = options['season'] or [settings.PFL_SEASON_ID]
+        if options['record'] and len(seasons) > 1:
+            raise CommandError('--record takes a single --season')
+        for season_id in seasons:
+            payload = matches.fetch_calendar(season_id)
+            if options['record']:
+                with open(options['record'], 'w') as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=2)
+            games = matches.calendar_games(payload)
+            try:
+                if options['dry_run']:
+                    count = len(matches.parse_all(games, season_id))
+                    self.stdout.write(f'Season {season_id}: {count} of {len(games)} games parsed')
+                    continue
+                count = matches.upsert(games, season_id)
+            except matches.CalendarShapeError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'Season {season_id}: {count} matches written'))
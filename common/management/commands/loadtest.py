@@ -0,0 +1,66 @@
+import asyncio
+import json
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Fires concurrent requests at a running server and reports throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--method', default='GET')
+        parser.add_argument('--data', help='JSON body, e.g. \'{"search": "xorazm"}\'')
+        parser.add_argument('--timeout', type=float, default=30)
+
+    async def _worker(self, client, queue, options, latencies, errors):
+        body = json.loads(options['data']) if options['data'] else None
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            try:
+                response = await client.request(options['method'], options['url'], json=body)
+                if response.status_code >= 500:
+                    errors.append(response.status_code)
+                else:
+                    latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError as e:
+                errors.append(type(e).__name__)
+
+    async def _run(self, options):
+        queue = asyncio.Queue()
+        for i in range(options['requests']):
+            queue.put_nowait(i)
+        latencies, errors = [], []
+        limits = httpx.Limits(max_connections=options['concurrency'])
+        async with httpx.AsyncClient(timeout=options['timeout'], limits=limits) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                self._worker(client, queue, options, latencies, errors) for _ in range(options['concurrency'])
+            ))
+            elapsed = time.perf_counter() - start
+        return latencies, errors, elapsed
+
+    def _percentile(self, values, percent):
+        return values[min(len(values) - 1, int(len(values) * percent / 100))] * 1000
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive')
+        latencies, errors, elapsed = asyncio.run(self._run(options))
+        latencies.sort()
+        self.stdout.write(f'{options["method"]} {options["url"]} concurrency={options["concurrency"]}')
+        self.stdout.write(f'ok={len(latencies)} errors={len(errors)} rps={len(latencies) / elapsed:.1f}')
+        if latencies:
+            self.stdout.write(
+                f'p50={self._percentile(latencies, 50):.1f}ms '
+                f'p99={self._percentile(latencies, 99):.1f}ms '
+                f'max={latencies[-1] * 1000:.1f}ms'
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from common import publish
+
+
+class Command(BaseCommand):
+    help = 'Renders the published endpoints to JSON files for nginx, e.g. after a deploy'
+
+    def handle(self, *args, **options):
+        publish.publish_all()
+        self.stdout.write(self.style.SUCCESS(f'Published {len(publish.PUBLISHED)} endpoints'))
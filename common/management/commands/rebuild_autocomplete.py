@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from common import autocomplete
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the Redis autocomplete index of news, players, coaches and leaders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = autocomplete.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from common import leaderboard, models
+from common.cache import bump_model_version
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the player leaderboards in Redis, e.g. after a bulk stats import'
+
+    def handle(self, *args, **options):
+        count = leaderboard.rebuild()
+        bump_model_version(models.Players)
+        self.stdout.write(self.style.SUCCESS(f'Ranked {count} players'))
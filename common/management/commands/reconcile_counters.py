@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from common import counters
+
+
+class Command(BaseCommand):
+    help = 'Recounts the denormalized counters (NewsCategory.news_count, PlayerCountry.players_count) and fixes drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drifted rows')
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile(fix=not options['dry_run'])
+        for model, counter, pk, stored, actual in drift:
+            self.stdout.write(f'{model.__name__} {pk} {counter}: {stored} -> {actual}')
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(drift)} drifted counters'))
@@ -0,0 +1,123 @@
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from common import models
+from common.cache import bump_model_version
+from common.client import get_pfl_client
+
+logger = logging.getLogger(__name__)
+
+FIELDS = (
+    'tournament_id', 'season_id', 'round', 'kickoff', 'home_team', 'home_logo', 'home_score',
+    'away_team', 'away_logo', 'away_score', 'stadium', 'finished', 'raw', 'updated_at',
+)
+
+# the calendar game parse_match reads, common/testdata/pfl_calendar.json has examples:
+# {"id", "tour", "date" (ISO 8601), "status", "stadium",
+#  "homeClub": {"name", "logo"}, "awayClub": {"name", "logo"}, "homeScore", "awayScore"}
+FINISHED, LIVE = ('finished', 'live')
+
+
+class CalendarShapeError(Exception):
+    pass
+
+
+def calendar_path(season_id=None):
+    params = {
+        'tournamentId': settings.PFL_TOURNAMENT_ID,
+        'seasonId': season_id or settings.PFL_SEASON_ID,
+        'clubId': settings.PFL_CLUB_ID,
+    }
+    return f'{settings.PFL_CALENDAR_PATH}?{urlencode(params)}'
+
+
+def calendar_games(payload):
+    return payload.get('data', {}).get('table', [])
+
+
+def _kickoff(value):
+    kickoff = parse_datetime(value) if value else None
+    if kickoff is not None and kickoff.tzinfo is not None:
+        # USE_TZ is off, kickoffs are stored in Tashkent time like the rest of the site
+        kickoff = kickoff.astimezone(ZoneInfo(settings.TIME_ZONE)).replace(tzinfo=None)
+    return kickoff
+
+
+def parse_match(item, season_id):
+    """
+    One game of the PFL calendar as an unsaved Match; the payload itself is kept in ``raw``.
+    Raises KeyError or TypeError when the game does not have the shape above.
+    """
+    status = item['status']
+    # scheduled games already come with 0:0, only a started game has a score
+    started = status in (FINISHED, LIVE)
+    return models.Match(
+        pfl_id=int(item['id']),
+        tournament_id=settings.PFL_TOURNAMENT_ID,
+        season_id=season_id,
+        round=str(item.get('tour') or ''),
+        kickoff=_kickoff(item.get('date')),
+        home_team=item['homeClub']['name'],
+        home_logo=item['homeClub'].get('logo') or '',
+        home_score=item.get('homeScore') if started else None,
+        away_team=item['awayClub']['name'],
+        away_logo=item['awayClub'].get('logo') or '',
+        away_score=item.get('awayScore') if started else None,
+        stadium=item.get('stadium') or '',
+        finished=status == FINISHED,
+        raw=item,
+    )
+
+
+def parse_all(items, season_id):
+    """
+    The games of a calendar that parse. Raises CalendarShapeError when none
+    of them does, which means PFL changed the schema rather than sent one odd game.
+    """
+    matches = []
+    for item in items:
+        try:
+            matches.append(parse_match(item, season_id))
+        except (KeyError, TypeError, ValueError):
+            # one odd game must not hold back the others, but a changed schema has to show up in the logs
+            logger.warning('skipped a PFL calendar game of unexpected shape: %r', item)
+    if items and not matches:
+        raise CalendarShapeError(f'none of the {len(items)} PFL calendar games has the shape parse_match reads')
+    return matches
+
+
+def upsert(items, season_id=None):
+    """
+    Inserts new games and updates changed ones in one statement. Returns how many rows were written.
+    """
+    season_id = season_id or settings.PFL_SEASON_ID
+    matches = parse_all(items, season_id)
+    # PFL answers the same calendar every few minutes, unchanged games are not rewritten
+    stored = dict(models.Match.objects.filter(pfl_id__in=[match.pfl_id for match in matches]).values_list('pfl_id', 'raw'))
+    changed = [match for match in matches if stored.get(match.pfl_id) != match.raw]
+    if changed:
+        models.Match.objects.bulk_create(
+            changed, batch_size=500, update_conflicts=True, unique_fields=['pfl_id'], update_fields=FIELDS,
+        )
+        # bulk_create skips post_save, so cached match responses are invalidated by hand
+        bump_model_version(models.Match)
+    return len(changed)
+
+
+def fetch_calendar(season_id=None):
+    return get_pfl_client().get(calendar_path(season_id)).json()
+
+
+def next_match():
+    # a game counts as upcoming until PFL marks it finished or it is long over
+    since = datetime.now() - timedelta(hours=settings.MATCH_DURATION_HOURS)
+    return models.Match.objects.filter(finished=False, kickoff__gte=since).order_by('kickoff').first()
+
+
+def last_results(limit):
+    return models.Match.objects.filter(finished=True).order_by('-kickoff')[:limit]
@@ -0,0 +1,47 @@
+import mimetypes
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
+from django.views.static import serve
+
+
+def _resolve(path):
+    # normpath folds any ../ first, so the checked name is the one nginx will open
+    name = posixpath.normpath(path).lstrip('/')
+    if not name or name == '.' or name.startswith('..') or '\x00' in name:
+        raise Http404
+    return name
+
+
+def can_access(request, name):
+    """
+    Every upload is public today; this is where per-file rules (drafts, members-only video) go.
+    """
+    return True
+
+
+def serve_media(request, path):
+    """
+    Resolves and authorizes an upload, then hands the transfer to nginx with
+    ``X-Accel-Redirect``: nginx streams it with sendfile and Range support, so
+    a long video download does not keep a Python worker busy.
+    """
+    name = _resolve(path)
+    if not can_access(request, name):
+        raise Http404
+    if not settings.MEDIA_ACCEL_REDIRECT:
+        # runserver without nginx
+        return serve(request, name, document_root=settings.MEDIA_ROOT)
+    if not default_storage.exists(name):
+        raise Http404
+
+    content_type, encoding = mimetypes.guess_type(name)
+    response = HttpResponse(content_type=content_type)
+    if content_type is None:
+        # without a Content-Type nginx picks one from the file extension
+        del response['Content-Type']
+    response['X-Accel-Redirect'] = f'{settings.MEDIA_ACCEL_PREFIX}{quote(name)}'
+    return response
@@ -0,0 +1,76 @@
+import os
+
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+    start_http_server,
+)
+
+# with PROMETHEUS_MULTIPROC_DIR set every worker writes its samples to files in that
+# directory and /metrics/ sums them, so it does not matter which worker Prometheus hits
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by resolved view',
+    ['view', 'method'], buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter('http_requests_total', 'Responses by view and status code', ['view', 'method', 'status'])
+DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries per request',
+    ['view'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+CACHE_REQUESTS = Counter('http_request_cache_total', 'Cache lookups per view, by hit or miss', ['view', 'result'])
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Latency of calls to upstream APIs such as pfl.uz',
+    ['upstream'], buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 30),
+)
+UPSTREAM_ERRORS = Counter('upstream_request_errors_total', 'Failed upstream calls', ['upstream', 'reason'])
+STAMPEDES = Counter(
+    'cache_stampede_total', 'Cache misses coalesced by single-flight, by how the caller was answered',
+    ['cache', 'result'],
+)
+
+
+def _view_name(request):
+    # unresolved paths share one label, so scanners cannot blow up the series count
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+def observe_request(request, response, request_metrics, total):
+    view = _view_name(request)
+    REQUEST_LATENCY.labels(view, request.method).observe(total)
+    REQUESTS.labels(view, request.method, response.status_code).inc()
+    DB_QUERIES.labels(view).observe(request_metrics.counts['db'])
+    CACHE_REQUESTS.labels(view, 'hit').inc(request_metrics.counts['cache_hits'])
+    CACHE_REQUESTS.labels(view, 'miss').inc(request_metrics.counts['cache_misses'])
+
+
+def observe_upstream(name, latency, status_code, error):
+    UPSTREAM_LATENCY.labels(name).observe(latency)
+    if error is not None:
+        UPSTREAM_ERRORS.labels(name, type(error).__name__).inc()
+    elif status_code >= 400:
+        UPSTREAM_ERRORS.labels(name, str(status_code)).inc()
+
+
+def observe_stampede(name, result):
+    STAMPEDES.labels(name, result).inc()
+
+
+def _registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def start_exporter(port):
+    """
+    Serves the metrics on ``port`` from a thread, for processes without Django's URLs such as the Celery worker.
+    """
+    start_http_server(port, registry=_registry())
@@ -0,0 +1,133 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils import translation
+
+from common import instrumentation, localization, metrics, routers
+
+
+class RequestLanguageMiddleware:
+    """
+    Lets ``?lang=`` override the language LocaleMiddleware picked, and
+    ``?translations=all`` opt back into every translation column.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _activate(self, request):
+        lang = request.GET.get('lang')
+        if lang in dict(settings.LANGUAGES):
+            translation.activate(lang)
+            request.LANGUAGE_CODE = lang
+        return localization.set_all_languages(request.GET.get(localization.ALL_LANGUAGES_PARAM) == 'all')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self._activate(request)
+        try:
+            return self.get_response(request)
+        finally:
+            localization.reset_all_languages(token)
+
+    async def __acall__(self, request):
+        token = self._activate(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            localization.reset_all_languages(token)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Safe requests under REPLICA_READ_PREFIX read from a replica. A write
+    sets a short-lived cookie, so the writer's next reads see it on the primary.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _route(self, request):
+        if (
+            request.method in ('GET', 'HEAD', 'OPTIONS')
+            and request.path.startswith(settings.REPLICA_READ_PREFIX)
+            and routers.PIN_COOKIE not in request.COOKIES
+        ):
+            return routers.read_from_replica()
+        return routers.read_from_primary()
+
+    def _pin(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400 and settings.DATABASE_REPLICAS:
+            response.set_cookie(routers.PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self._route(request)
+        try:
+            return self._pin(request, self.get_response(request))
+        finally:
+            routers.reset(token)
+
+    async def __acall__(self, request):
+        token = self._route(request)
+        try:
+            return self._pin(request, await self.get_response(request))
+        finally:
+            routers.reset(token)
+
+
+class ServerTimingMiddleware:
+    """
+    Splits each request's time into SQL, cache, PFL and the rest. The result goes
+    into a JSON log line and the Prometheus metrics, and the view's query budget
+    is checked. Only DEBUG and INTERNAL_IPS also get a ``Server-Timing`` header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _finish(self, request, response):
+        request_metrics = instrumentation.current()
+        total = time.perf_counter() - request_metrics.start
+        # not on DEBUG: it is the raw env string here, and DEBUG=False in the environment is truthy
+        if request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+            response['Server-Timing'] = request_metrics.server_timing(total)
+        instrumentation.log_request(request, response, request_metrics, total)
+        metrics.observe_request(request, response, request_metrics, total)
+        instrumentation.check_query_budget(request, request_metrics)
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = instrumentation.start()
+        try:
+            return self._finish(request, self.get_response(request))
+        finally:
+            instrumentation.stop(token)
+
+    async def __acall__(self, request):
+        token = instrumentation.start()
+        try:
+            return self._finish(request, await self.get_response(request))
+        finally:
+            instrumentation.stop(token)
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:24
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='link',
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='NewsMedia',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('image', models.ImageField(upload_to='news_media')),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medias', to='common.news')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:24
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def fill_news_search_vector(apps, schema_editor):
+    News = apps.get_model('common', 'News')
+    News.objects.update(search_vector=(
+        SearchVector('title_uz', 'title_ru', 'title_en', config='simple', weight='A')
+        + SearchVector('description_uz', 'description_ru', 'description_en', config='simple', weight='B')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_news_link_newsmedia'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='news',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='coach',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['full_name'], name='coach_full_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='leaders',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['full_name'], name='leaders_full_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['full_name'], name='players_full_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(fill_news_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_news_search_vector_name_trigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='news_category_created_idx'),
+        ),
+    ]
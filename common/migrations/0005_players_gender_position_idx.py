@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_news_category_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['gender', 'position'], name='players_gender_position_idx'),
+        ),
+    ]
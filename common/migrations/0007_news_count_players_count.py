@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    for parent, child, field, counter in (
+        ('NewsCategory', 'News', 'category', 'news_count'),
+        ('PlayerCountry', 'Players', 'country', 'players_count'),
+    ):
+        Child = apps.get_model('common', child)
+        count = Subquery(
+            Child.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+            .annotate(count=Count('pk')).values('count')
+        )
+        apps.get_model('common', parent).objects.update(**{counter: Coalesce(count, 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0006_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newscategory',
+            name='news_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='playercountry',
+            name='players_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:55
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0007_news_count_players_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('pfl_id', models.PositiveIntegerField(unique=True)),
+                ('tournament_id', models.PositiveIntegerField()),
+                ('season_id', models.PositiveIntegerField()),
+                ('round', models.CharField(blank=True, max_length=64)),
+                ('kickoff', models.DateTimeField(null=True)),
+                ('home_team', models.CharField(max_length=255)),
+                ('home_logo', models.URLField(blank=True, max_length=500)),
+                ('home_score', models.PositiveSmallIntegerField(null=True)),
+                ('away_team', models.CharField(max_length=255)),
+                ('away_logo', models.URLField(blank=True, max_length=500)),
+                ('away_score', models.PositiveSmallIntegerField(null=True)),
+                ('stadium', models.CharField(blank=True, max_length=255)),
+                ('finished', models.BooleanField(default=False)),
+                ('raw', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': "o'yin",
+                'verbose_name_plural': "o'yinlar",
+                'indexes': [models.Index(fields=['finished', 'kickoff'], name='match_finished_kickoff_idx'), models.Index(fields=['season_id', 'kickoff'], name='match_season_kickoff_idx'), models.Index(fields=['kickoff'], name='match_kickoff_idx')],
+            },
+        ),
+    ]
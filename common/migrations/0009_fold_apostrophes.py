@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:12
+
+import common.text
+import django.contrib.postgres.indexes
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def refill_news_search_vector(apps, schema_editor):
+    # O'zbekiston is now indexed as ozbekiston, like the folded query
+    News = apps.get_model('common', 'News')
+    fold = common.text.FoldApostrophes
+    News.objects.update(search_vector=(
+        SearchVector(*map(fold, ('title_uz', 'title_ru', 'title_en')), config='simple', weight='A')
+        + SearchVector(*map(fold, ('description_uz', 'description_ru', 'description_en')), config='simple', weight='B')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0008_match'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='coach',
+            name='coach_full_name_trgm',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaders',
+            name='leaders_full_name_trgm',
+        ),
+        migrations.RemoveIndex(
+            model_name='players',
+            name='players_full_name_trgm',
+        ),
+        migrations.AddIndex(
+            model_name='coach',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(common.text.FoldApostrophes('full_name'), name='gin_trgm_ops'), name='coach_folded_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='leaders',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(common.text.FoldApostrophes('full_name'), name='gin_trgm_ops'), name='leaders_folded_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(common.text.FoldApostrophes('full_name'), name='gin_trgm_ops'), name='players_folded_name_trgm'),
+        ),
+        migrations.RunPython(refill_news_search_vector, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,15 @@
 import uuid
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
 from django.utils.translation import gettext_lazy as _
 
+from common.text import FoldApostrophes
+
 MAN, WOMEN, U19, U21 = ('Erkak', 'Ayol', 'U19', 'U21')
 ACADEMY_COACH, TEAM_COACH = ('akademik murabbiy', 'jamoa murabbiy')
+SQUADS = {'man': MAN, 'women': WOMEN, 'u19': U19, 'u21': U21}
 
 class BaseModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -14,8 +19,19 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class ImageDerivativesModel(models.Model):
+    # resized WebP/JPEG copies of ``derivative_fields``, filled in by common.tasks
+    derivative_fields = ('image',)
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
 class NewsCategory(BaseModel):
     name = models.CharField(max_length=255)
+    # kept up to date by common.counters
+    news_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -25,7 +41,7 @@ class NewsCategory(BaseModel):
         verbose_name_plural = _('yangilik turlari')
 
 
-class News(BaseModel):
+class News(ImageDerivativesModel, BaseModel):
     title = models.CharField(max_length=255, unique=True)
     slug = models.SlugField(max_length=255, unique=True)
     description = models.TextField()
@@ -33,6 +49,7 @@ class News(BaseModel):
     category = models.ForeignKey(NewsCategory, on_delete=models.CASCADE, related_name='news')
     video = models.FileField(upload_to='news/%Y/%m/', null=True, blank=True)
     link = models.URLField(null=True, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -40,9 +57,13 @@ class News(BaseModel):
     class Meta:
         verbose_name = _("yangiliklar")
         verbose_name_plural = _('yangiliklar')
+        indexes = [
+            GinIndex(fields=['search_vector'], name='news_search_vector_gin'),
+            models.Index(fields=['category', '-created_at', '-id'], name='news_category_created_idx'),
+        ]
 
 
-class NewsMedia(BaseModel):
+class NewsMedia(ImageDerivativesModel, BaseModel):
     image = models.ImageField(upload_to='news_media')
     news = models.ForeignKey(News, on_delete=models.CASCADE, related_name='medias')
 
@@ -53,6 +74,8 @@ class NewsMedia(BaseModel):
 class PlayerCountry(BaseModel):
     flag = models.ImageField(upload_to='flags/%Y/%m/')
     name = models.CharField(max_length=255)
+    # kept up to date by common.counters
+    players_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -73,7 +96,7 @@ class PlayerPosition(BaseModel):
         verbose_name_plural = _('futbolchi pozisiyalari')
 
 
-class Players(BaseModel):
+class Players(ImageDerivativesModel, BaseModel):
     GENDER = (
         (WOMEN, _("Ayol")),
         (MAN, _("Erkak")),
@@ -100,9 +123,14 @@ class Players(BaseModel):
         verbose_name = _("futbolchi")
         verbose_name_plural = _('futbolchilar')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['gender', 'position'], name='players_gender_position_idx'),
+            # search matches names with apostrophes folded, see common.text
+            GinIndex(OpClass(FoldApostrophes('full_name'), name='gin_trgm_ops'), name='players_folded_name_trgm'),
+        ]
 
 
-class Partners(BaseModel):
+class Partners(ImageDerivativesModel, BaseModel):
     image = models.ImageField(upload_to='partners/%Y/%m/')
     link = models.URLField()
 
@@ -138,7 +166,9 @@ class Stadium(BaseModel):
         verbose_name_plural = _('stadionlar haqida')
 
 
-class Banner(BaseModel):
+class Banner(ImageDerivativesModel, BaseModel):
+    derivative_fields = ('banner',)
+
     banner = models.ImageField(upload_to='banners/%Y/%m/')
     title = models.CharField(max_length=255)
     link = models.URLField()
@@ -174,7 +204,9 @@ class CoachPosition(BaseModel):
         verbose_name_plural = _('murabbiy pozitsiyalari')
 
 
-class Coach(BaseModel):
+class Coach(ImageDerivativesModel, BaseModel):
+    derivative_fields = ('image', 'banner')
+
     GENDER = (
         (WOMEN, _("Ayol")),
         (MAN, _("Erkak")),
@@ -197,6 +229,10 @@ class Coach(BaseModel):
     class Meta:
         verbose_name = _("murabbiylar")
         verbose_name_plural = _('murabbiylar')
+        indexes = [
+            # search matches names with apostrophes folded, see common.text
+            GinIndex(OpClass(FoldApostrophes('full_name'), name='gin_trgm_ops'), name='coach_folded_name_trgm'),
+        ]
 
 
 class CoachInformation(BaseModel):
@@ -212,7 +248,7 @@ class CoachInformation(BaseModel):
         verbose_name_plural = _('murabbiy malumotlari')
 
 
-class Leaders(BaseModel):
+class Leaders(ImageDerivativesModel, BaseModel):
     full_name = models.CharField(max_length=255)
     position = models.CharField(max_length=255)
     country = models.CharField(max_length=255)
@@ -224,4 +260,40 @@ class Leaders(BaseModel):
     
     class Meta:
         verbose_name = _("raxbariyat")
-        verbose_name_plural = _('raxbariyat')
\ No newline at end of file
+        verbose_name_plural = _('raxbariyat')
+        indexes = [
+            # search matches names with apostrophes folded, see common.text
+            GinIndex(OpClass(FoldApostrophes('full_name'), name='gin_trgm_ops'), name='leaders_folded_name_trgm'),
+        ]
+
+
+class Match(BaseModel):
+    # mirrored from the PFL calendar by common.matches, never edited by hand
+    pfl_id = models.PositiveIntegerField(unique=True)
+    tournament_id = models.PositiveIntegerField()
+    season_id = models.PositiveIntegerField()
+    round = models.CharField(max_length=64, blank=True)
+    kickoff = models.DateTimeField(null=True)
+    home_team = models.CharField(max_length=255)
+    home_logo = models.URLField(max_length=500, blank=True)
+    home_score = models.PositiveSmallIntegerField(null=True)
+    away_team = models.CharField(max_length=255)
+    away_logo = models.URLField(max_length=500, blank=True)
+    away_score = models.PositiveSmallIntegerField(null=True)
+    stadium = models.CharField(max_length=255, blank=True)
+    finished = models.BooleanField(default=False)
+    raw = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.home_team} - {self.away_team}"
+
+    class Meta:
+        verbose_name = _("o'yin")
+        verbose_name_plural = _("o'yinlar")
+        indexes = [
+            # next match and last results
+            models.Index(fields=['finished', 'kickoff'], name='match_finished_kickoff_idx'),
+            models.Index(fields=['season_id', 'kickoff'], name='match_season_kickoff_idx'),
+            models.Index(fields=['kickoff'], name='match_kickoff_idx'),
+        ]
@@ -0,0 +1,99 @@
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from common import metrics, singleflight
+from common.client import UpstreamError, get_async_pfl_client, get_pfl_client
+
+logger = logging.getLogger(__name__)
+
+TABLE, CALENDAR = ('table', 'calendar')
+
+SNAPSHOT_TIMEOUT = 7*24*60*60
+
+
+def _key(name, suffix):
+    return f'pfl:{name}:{suffix}'
+
+
+def _parse(payload):
+    return payload.get('data', {}).get('table', [])
+
+
+def fetch(name):
+    return _parse(get_pfl_client().get(settings.PFL_PATHS[name]).json())
+
+
+async def afetch(name):
+    response = await get_async_pfl_client().get(settings.PFL_PATHS[name])
+    return _parse(response.json())
+
+
+def save_snapshot(name, data):
+    try:
+        version = cache.incr(_key(name, 'version'))
+    except ValueError:
+        version = int(time.time())
+        cache.set(_key(name, 'version'), version, timeout=None)
+    snapshot = {'version': version, 'fetched_at': time.time(), 'data': data}
+    # the snapshot is written before the pointer moves, so readers never see a half-written version
+    cache.set(_key(name, version), snapshot, SNAPSHOT_TIMEOUT)
+    cache.set(_key(name, 'latest'), version, timeout=None)
+    return snapshot
+
+
+def refresh_snapshot(name):
+    try:
+        return save_snapshot(name, fetch(name))
+    finally:
+        # released after a failure too, the next stale read retries; during an outage the breaker answers those
+        cache.delete(_key(name, 'refreshing'))
+
+
+def schedule_refresh(name):
+    from common.tasks import refresh_pfl_snapshot
+
+    # only the first request that notices a stale snapshot enqueues a refresh, the rest serve the stale one
+    if cache.add(_key(name, 'refreshing'), 1, settings.PFL_REFRESH_LOCK_TIMEOUT):
+        metrics.observe_stampede(f'pfl:{name}', 'computed')
+        refresh_pfl_snapshot.delay(name)
+    else:
+        metrics.observe_stampede(f'pfl:{name}', 'stale')
+
+
+def is_stale(name, snapshot):
+    return time.time() - snapshot['fetched_at'] > settings.PFL_REFRESH_INTERVALS[name]
+
+
+async def _alatest(name):
+    version = await cache.aget(_key(name, 'latest'))
+    return await cache.aget(_key(name, version)) if version is not None else None
+
+
+async def aget_snapshot(name):
+    snapshot = await _alatest(name)
+    if snapshot is None:
+        return await _afetch_first_snapshot(name)
+    if is_stale(name, snapshot):
+        await sync_to_async(schedule_refresh)(name)
+    return snapshot
+
+
+async def _afetch_first_snapshot(name):
+    # with nothing to serve yet the async view fetches inline, awaiting PFL does not hold a worker
+    if not await cache.aadd(_key(name, 'refreshing'), 1, settings.PFL_REFRESH_LOCK_TIMEOUT):
+        # someone else is already fetching it, wait for theirs rather than calling PFL too
+        snapshot = await singleflight.await_value(lambda: _alatest(name))
+        metrics.observe_stampede(f'pfl:{name}', 'waited' if snapshot is not None else 'timed_out')
+        return snapshot
+    metrics.observe_stampede(f'pfl:{name}', 'computed')
+    try:
+        return await sync_to_async(save_snapshot)(name, await afetch(name))
+    except UpstreamError:
+        logger.warning('could not fetch the first %s snapshot', name, exc_info=True)
+        return None
+    finally:
+        await cache.adelete(_key(name, 'refreshing'))
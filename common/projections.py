@@ -0,0 +1,154 @@
+from django.db.models import QuerySet
+
+from common import images, localization, reference
+
+
+class Column:
+    def __init__(self, source):
+        self.source = source
+
+    def columns(self):
+        return [self.source]
+
+    def to_representation(self, row, context):
+        return row[self.source]
+
+
+class DateColumn(Column):
+    def to_representation(self, row, context):
+        return row[self.source].date()
+
+
+class TranslatedColumn(Column):
+    """
+    The active language's column, falling back the way modeltranslation does.
+    """
+
+    def _sources(self):
+        return [f'{self.source}_{code}' for code in localization.language_order()]
+
+    def columns(self):
+        return self._sources()
+
+    def to_representation(self, row, context):
+        for source in self._sources():
+            if row[source]:
+                return row[source]
+        return row[self._sources()[0]]
+
+
+class ReferenceColumn(Column):
+    """
+    A lookup table row found by the foreign key column ``source`` in the
+    in-process reference cache instead of a join. ``fields`` is a tuple for a
+    nested dict, or one attribute name for a single (translated) value.
+    """
+
+    def __init__(self, source, model, fields):
+        super().__init__(source)
+        self.model = model
+        self.fields = fields
+
+    def to_representation(self, row, context):
+        instance = reference.get(self.model, row[self.source])
+        if instance is None:
+            return None
+        if isinstance(self.fields, str):
+            return getattr(instance, self.fields)
+        return localization.localize_dict({field: getattr(instance, field) for field in self.fields})
+
+
+class ImageColumn(Column):
+    def __init__(self, source, storage):
+        super().__init__(source)
+        self.storage = storage
+
+    def to_representation(self, row, context):
+        name = row[self.source]
+        if not name:
+            return None
+        url = self.storage.url(name)
+        request = context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class SrcsetColumn(ImageColumn):
+    def __init__(self, source, storage, derivatives='derivatives'):
+        super().__init__(source, storage)
+        self.derivatives = derivatives
+
+    def columns(self):
+        return [self.derivatives]
+
+    def to_representation(self, row, context):
+        field_name = self.source.rsplit('__', 1)[-1]
+        return images.build_srcset(row[self.derivatives], field_name, self.storage, context.get('request'))
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer over ``QuerySet.values()`` rows.
+
+    ``fields`` declares the output once: each key maps to a column name, a
+    ``Column`` or a nested dict of those. The queryset only selects the
+    columns the shape needs and rows are turned into plain dicts, no model
+    instances or DRF fields are built per row.
+    """
+    fields = {}
+
+    def __init__(self, instance, context=None):
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def _columns(cls, shape):
+        for value in shape.values():
+            if isinstance(value, dict):
+                yield from cls._columns(value)
+            elif isinstance(value, Column):
+                yield from value.columns()
+            else:
+                yield value
+
+    @classmethod
+    def _localize(cls, shape):
+        # <key>_uz/ru/en columns become a single translated <key>, like LocalizedModelSerializer
+        if not localization.is_localized():
+            return shape
+        groups = localization.translated_groups(list(shape))
+        grouped = {key for base, group in groups.values() for key in group}
+        result = {}
+        for key, value in shape.items():
+            if key in groups and isinstance(value, str):
+                code = key.rsplit('_', 1)[1]
+                result[groups[key][0]] = TranslatedColumn(value[:-len(code) - 1])
+            elif key not in grouped:
+                result[key] = cls._localize(value) if isinstance(value, dict) else value
+        return result
+
+    @classmethod
+    def get_shape(cls):
+        return cls._localize(cls.fields)
+
+    @classmethod
+    def project(cls, queryset):
+        return queryset.values(*dict.fromkeys(cls._columns(cls.get_shape())))
+
+    def _represent(self, shape, row):
+        data = {}
+        for key, value in shape.items():
+            if isinstance(value, dict):
+                data[key] = self._represent(value, row)
+            elif isinstance(value, Column):
+                data[key] = value.to_representation(row, self.context)
+            else:
+                data[key] = row[value]
+        return data
+
+    @property
+    def data(self):
+        rows = self.instance
+        if isinstance(rows, QuerySet):
+            rows = self.project(rows)
+        shape = self.get_shape()
+        return [self._represent(shape, row) for row in rows]
@@ -0,0 +1,90 @@
+import gzip
+import os
+import tempfile
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils import translation
+
+from common import models
+
+PREFIX = '/api/v1/common/'
+
+# endpoints rendered to disk for nginx, with the models whose changes republish them
+PUBLISHED = {
+    'about-club/': (models.AboutCompany,),
+    'stadiums/': (models.Stadium,),
+    'about-academy/list/': (models.AboutAcademy,),
+    'leaders/list/': (models.Leaders,),
+    'partners/': (models.Partners,),
+    'banners/': (models.Banner,),
+}
+
+
+def paths_for_model(model):
+    return [path for path, model_list in PUBLISHED.items() if model in model_list]
+
+
+def _file(lang, path):
+    return Path(settings.PUBLISH_ROOT) / lang / f'{PREFIX}{path}'.lstrip('/') / 'index.json'
+
+
+def _write_atomic(target, content):
+    # nginx may open the file at any moment, so it only ever sees a complete one
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix='.publish-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _remove(target):
+    for name in (target, target.with_name(target.name + '.gz')):
+        name.unlink(missing_ok=True)
+
+
+def render(path, lang):
+    """
+    Runs the real view, so the file is byte for byte what Django would answer.
+    """
+    base_url = urlsplit(settings.PUBLISH_BASE_URL)
+    request = RequestFactory().get(
+        f'{PREFIX}{path}', HTTP_HOST=base_url.netloc, secure=base_url.scheme == 'https',
+    )
+    match = resolve(request.path)
+    with translation.override(lang):
+        request.LANGUAGE_CODE = lang
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    return response
+
+
+def publish(path):
+    for lang, name in settings.LANGUAGES:
+        target = _file(lang, path)
+        response = render(path, lang)
+        if response.status_code != 200:
+            # nothing on disk sends readers back to Django
+            _remove(target)
+            continue
+        _write_atomic(target.with_name(target.name + '.gz'), gzip.compress(response.content, mtime=0))
+        _write_atomic(target, response.content)
+
+
+def publish_for_model(model):
+    for path in paths_for_model(model):
+        publish(path)
+
+
+def publish_all():
+    for path in PUBLISHED:
+        publish(path)
@@ -0,0 +1,157 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from common import models
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'reference:invalidate'
+
+# lookup tables small enough to keep whole in every worker; counter columns such as
+# news_count change through update() and are not kept current here, read them from the database
+MODELS = (models.NewsCategory, models.PlayerPosition, models.CoachPosition, models.PlayerCountry)
+
+_lock = threading.Lock()
+# model label -> (loaded at, {pk: instance} in created_at order), least recently used first
+_tables = OrderedDict()
+# model label -> times it was invalidated, None counts invalidations of every table
+_generations = {}
+_listener = {'pid': None}
+
+
+def is_reference(model):
+    return model in MODELS
+
+
+def _load(model):
+    # from the primary: a lagging replica right after an invalidation would be kept for REFERENCE_CACHE_TIMEOUT
+    rows = list(model.objects.using('default').order_by('created_at')[:settings.REFERENCE_MAX_ROWS + 1])
+    if len(rows) > settings.REFERENCE_MAX_ROWS:
+        logger.warning('%s has outgrown the reference cache', model._meta.label)
+        return None
+    return {row.pk: row for row in rows}
+
+
+def _generation(label):
+    return _generations.get(None, 0), _generations.get(label, 0)
+
+
+def _table(model):
+    _ensure_listener()
+    label = model._meta.label
+    with _lock:
+        entry = _tables.get(label)
+        if entry is not None and time.monotonic() - entry[0] < settings.REFERENCE_CACHE_TIMEOUT:
+            _tables.move_to_end(label)
+            return entry[1]
+        generation = _generation(label)
+
+    # loaded outside the lock, two threads racing here only cost one extra query
+    for _ in range(3):
+        rows = _load(model)
+        if rows is None:
+            return None
+        with _lock:
+            # an invalidation that came in while loading may mean these rows predate the edit
+            if _generation(label) != generation:
+                generation = _generation(label)
+                continue
+            _tables[label] = (time.monotonic(), rows)
+            _tables.move_to_end(label)
+            while len(_tables) > settings.REFERENCE_CACHE_SIZE:
+                _tables.popitem(last=False)
+            return rows
+    # still invalidated on every try, answer from the last load without keeping it
+    return rows
+
+
+def get(model, pk):
+    """
+    The row of a lookup table by primary key, read from this process's memory,
+    or None when there is no such row.
+    """
+    rows = _table(model)
+    if rows is not None and pk in rows:
+        return rows[pk]
+    if pk is None:
+        return None
+    # created in another worker before its invalidation reached us, or the message was lost
+    row = model.objects.using('default').filter(pk=pk).first()
+    if row is not None and rows is not None:
+        invalidate(model._meta.label)
+    return row
+
+
+def all_rows(model):
+    rows = _table(model)
+    if rows is None:
+        return list(model.objects.using('default').order_by('created_at'))
+    return list(rows.values())
+
+
+def invalidate(label=None):
+    with _lock:
+        _generations[label] = _generations.get(label, 0) + 1
+        if label is None:
+            _tables.clear()
+        else:
+            _tables.pop(label, None)
+
+
+def publish(model):
+    """
+    Drops ``model`` here at once and in every other worker through Redis pub/sub.
+    """
+    invalidate(model._meta.label)
+    try:
+        get_redis_connection('default').publish(CHANNEL, model._meta.label)
+    except Exception:
+        # the others fall back to REFERENCE_CACHE_TIMEOUT
+        logger.exception('could not publish reference invalidation for %s', model._meta.label)
+
+
+def _subscribe():
+    pubsub = get_redis_connection('default').pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CHANNEL)
+    return pubsub
+
+
+def _listen(pubsub):
+    while True:
+        try:
+            if pubsub is None:
+                pubsub = _subscribe()
+                # messages sent while we were not subscribed are lost, so start from scratch
+                invalidate()
+            for message in pubsub.listen():
+                invalidate(message['data'].decode())
+        except Exception:
+            logger.exception('reference invalidation listener failed, reconnecting')
+            invalidate()
+            pubsub = None
+            time.sleep(settings.REFERENCE_LISTENER_RETRY)
+
+
+def _ensure_listener():
+    # threads do not survive a fork, so every worker process starts its own
+    if _listener['pid'] == os.getpid():
+        return
+    with _lock:
+        if _listener['pid'] == os.getpid():
+            return
+        _tables.clear()
+        # subscribed before the first table is loaded, so nothing can be missed and the
+        # listener need not clear the tables again while the first loads are running
+        try:
+            pubsub = _subscribe()
+        except Exception:
+            logger.exception('could not subscribe to reference invalidations, retrying in the listener')
+            pubsub = None
+        threading.Thread(target=_listen, args=(pubsub,), name='reference-listener', daemon=True).start()
+        _listener['pid'] = os.getpid()
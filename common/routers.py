@@ -0,0 +1,53 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# a browser that wrote something reads from the primary while this cookie lives
+PIN_COOKIE = 'db_primary'
+
+# the replica this request reads from, None reads from the primary
+_read_database = ContextVar('read_database', default=None)
+
+
+def read_from_replica():
+    return _read_database.set(random.choice(settings.DATABASE_REPLICAS) if settings.DATABASE_REPLICAS else None)
+
+
+def read_from_primary():
+    return _read_database.set(None)
+
+
+def reset(token):
+    _read_database.reset(token)
+
+
+def pin_primary_if_changed(last_modified):
+    """
+    Replicas may still be behind a change made in the last REPLICA_PIN_SECONDS;
+    a response built from one would be cached under the new model version.
+    """
+    if time.time() - last_modified < settings.REPLICA_PIN_SECONDS:
+        read_from_primary()
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica ``ReplicaRoutingMiddleware`` picked for the
+    request, everything else and every read after a write to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        read_from_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,218 @@
+import hashlib
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import CharField, DateField, F, Lookup, Value
+from django.db.models.functions import Cast, Coalesce, JSONObject
+from django.db.models.lookups import IContains
+from django.utils import translation
+from django_redis import get_redis_connection
+from modeltranslation.utils import get_language
+
+from common import images, localization, models
+from common.cache import get_model_versions
+from common.text import FoldApostrophes, normalize
+
+# 'simple' keeps one vector for all three languages, Uzbek has no postgres dictionary anyway
+SEARCH_CONFIG = 'simple'
+
+# a change to any of these can change search results
+SEARCHED_MODELS = (models.News, models.NewsCategory, models.Players, models.Coach, models.CoachPosition, models.Leaders)
+
+POPULAR_KEY = 'search:popular'
+
+
+def normalize_query(text):
+    """
+    Folds case, punctuation and apostrophes, so o', o‘ and oʻ share one cache entry and match the index.
+    """
+    return normalize(text)
+
+
+def news_search_vector():
+    # folded like the query, or O'zbekiston would be indexed as o + zbekiston
+    return (
+        SearchVector(*map(FoldApostrophes, ('title_uz', 'title_ru', 'title_en')), config=SEARCH_CONFIG, weight='A')
+        + SearchVector(
+            *map(FoldApostrophes, ('description_uz', 'description_ru', 'description_en')), config=SEARCH_CONFIG, weight='B',
+        )
+    )
+
+
+def update_news_search_vector(queryset):
+    return queryset.update(search_vector=news_search_vector())
+
+
+def build_query(text):
+    # every word is matched as a prefix, so results show up while the fan is still typing
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), config=SEARCH_CONFIG, search_type='raw')
+
+
+def _ranked(queryset, kind, rank, limit, **payload):
+    # separate annotate() calls pin the column order, every part of the UNION has to line up
+    return (
+        queryset
+        .annotate(kind=Value(kind, output_field=CharField()))
+        .annotate(rank=rank)
+        .annotate(payload=JSONObject(**payload))
+        .order_by('-rank')
+        .values('kind', 'rank', 'payload')[:limit]
+    )
+
+
+class TrigramContains(IContains):
+    """
+    ``icontains`` as a bare ILIKE. Django compares UPPER() of both sides, and
+    a gin_trgm_ops index on the column is not used for UPPER(column).
+    """
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = Lookup.process_lhs(self, compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', (*lhs_params, *rhs_params)
+
+
+def _by_name(queryset, text, kind, limit, **payload):
+    # both arms compare exactly the *_folded_name_trgm index expression, one unindexed arm would scan the table
+    name = FoldApostrophes('full_name')
+    queryset = queryset.filter(TrigramContains(name, text) | TrigramWordSimilar(name, text))
+    return _ranked(queryset, kind, TrigramWordSimilarity(text, name), limit, **payload)
+
+
+def _media_url(name):
+    return default_storage.url(name) if name else None
+
+
+def _empty():
+    return {'news': [], 'players': [], 'coaches': [], 'leaders': []}
+
+
+def build_search_queryset(text, limit=5):
+    """
+    Ranked search over news and people as a single UNION ALL query,
+    or None when ``text`` has nothing to search for.
+    """
+    text = text.strip()
+    query = build_query(text)
+    if query is None:
+        return None
+
+    lang = get_language()
+    news = _ranked(
+        # rewrite(False) keeps modeltranslation from reshuffling the values() columns
+        models.News.objects.rewrite(False).filter(search_vector=query), 'news', SearchRank(F('search_vector'), query), limit,
+        id='id', slug='slug', title_uz='title_uz', title_ru='title_ru', title_en='title_en',
+        image='image', derivatives='derivatives', date=Cast('created_at', DateField()),
+        category_name=Coalesce(f'category__name_{lang}', f'category__name_{settings.MODELTRANSLATION_DEFAULT_LANGUAGE}'),
+    )
+    players = _by_name(
+        models.Players.objects.all(), text, 'players', limit,
+        id='id', full_name='full_name', number='number', image='image', derivatives='derivatives', gender='gender',
+    )
+    coaches = _by_name(
+        models.Coach.objects.all(), text, 'coaches', limit,
+        id='id', full_name='full_name', image='image', derivatives='derivatives',
+        position=JSONObject(
+            id='position__id', name_uz='position__name_uz', name_ru='position__name_ru', name_en='position__name_en',
+        ),
+    )
+    leaders = _by_name(
+        models.Leaders.objects.all(), text, 'leaders', limit,
+        id='id', full_name='full_name', image='image', derivatives='derivatives', position='position',
+        country='country', birth_date='birth_date',
+    )
+    return news.union(players, coaches, leaders, all=True)
+
+
+def group_results(rows):
+    """
+    Groups union rows by kind, in the shape of the list serializers the old endpoint used.
+    """
+    data = _empty()
+    for row in sorted(rows, key=lambda row: row['rank'], reverse=True):
+        payload = row['payload']
+        payload['image'] = _media_url(payload['image'])
+        payload['image_srcset'] = images.build_srcset(payload.pop('derivatives'), 'image', default_storage)
+        data[row['kind']].append(localization.localize_dict(payload))
+    return data
+
+
+def search(text, limit=5):
+    queryset = build_search_queryset(text, limit)
+    if queryset is None:
+        return _empty()
+    return group_results(queryset)
+
+
+async def asearch(text, limit=5):
+    queryset = build_search_queryset(text, limit)
+    if queryset is None:
+        return _empty()
+    return group_results([row async for row in queryset])
+
+
+def _result_key(text, versions):
+    digest = hashlib.md5(text.encode()).hexdigest()
+    return f'search:{localization.get_cache_language()}:{digest}:{".".join(str(version) for version in versions)}'
+
+
+def cached_search(text):
+    """
+    ``search`` of an already normalized query, cached per language until a searched model changes.
+    """
+    key = _result_key(text, get_model_versions(*SEARCHED_MODELS))
+    data = cache.get(key)
+    if data is None:
+        data = search(text)
+        cache.set(key, data, settings.SEARCH_CACHE_TIMEOUT)
+    return data
+
+
+async def acached_search(text):
+    key = _result_key(text, await sync_to_async(get_model_versions)(*SEARCHED_MODELS))
+    data = await cache.aget(key)
+    if data is None:
+        data = await asearch(text)
+        await cache.aset(key, data, settings.SEARCH_CACHE_TIMEOUT)
+    return data
+
+
+def track_query(text, data):
+    # queries nothing matches are typos, they would only crowd the top of the set
+    if any(data.values()):
+        get_redis_connection('default').zincrby(POPULAR_KEY, 1, text)
+
+
+def popular_queries(limit):
+    return [member.decode() for member in get_redis_connection('default').zrevrange(POPULAR_KEY, 0, limit - 1)]
+
+
+def prewarm(limit=None):
+    """
+    Caches the most searched queries in every language, run after content changes.
+    """
+    connection = get_redis_connection('default')
+    # only the top of the set is ever read, the long tail is dropped here
+    connection.zremrangebyrank(POPULAR_KEY, 0, -settings.SEARCH_POPULAR_SIZE - 1)
+    queries = popular_queries(limit or settings.SEARCH_PREWARM_COUNT)
+    for lang, name in settings.LANGUAGES:
+        with translation.override(lang):
+            for text in queries:
+                cached_search(text)
+    return len(queries)
+
+
+def schedule_prewarm():
+    from common.tasks import prewarm_search
+
+    # a burst of admin edits is prewarmed once, after it settles
+    if cache.add('search:prewarm:scheduled', 1, settings.SEARCH_PREWARM_DELAY):
+        prewarm_search.apply_async(countdown=settings.SEARCH_PREWARM_DELAY)
@@ -1,41 +1,91 @@
 from rest_framework import serializers
 
-from common import models
-
-
-class NewsCategorySerializer(serializers.ModelSerializer):
+from common import images, localization, models, projections, reference
+
+
+def reference_data(serializer_class, model, pk):
+    # None for a row deleted while this one was read, like a null foreign key
+    instance = reference.get(model, pk)
+    return serializer_class(instance).data if instance is not None else None
+
+
+class SrcsetField(serializers.Field):
+    """
+    ``{"webp": "<url> 320w, ...", "jpeg": "..."}`` built from the derivatives of ``image_field``.
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        storage = instance._meta.get_field(self.image_field).storage
+        return images.build_srcset(instance.derivatives, self.image_field, storage, self.context.get('request'))
+
+
+class LocalizedModelSerializer(serializers.ModelSerializer):
+    """
+    Emits ``<field>`` in the active language instead of ``<field>_uz/ru/en``,
+    unless the request opted into every translation with ?translations=all.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not localization.is_localized():
+            return fields
+        groups = localization.translated_groups(list(fields))
+        grouped = {name for base, group in groups.values() for name in group}
+        result = {}
+        for name, field in fields.items():
+            if name in groups:
+                base = groups[name][0]
+                # modeltranslation's descriptor already resolves the active language and its fallbacks
+                result[base] = serializers.CharField(read_only=True)
+            elif name not in grouped:
+                result[name] = field
+        return result
+
+
+class NewsCategorySerializer(LocalizedModelSerializer):
     class Meta:
         model = models.NewsCategory
-        fields = ('id', 'name_uz', 'name_ru', 'name_en')
+        fields = ('id', 'name_uz', 'name_ru', 'name_en', 'news_count')
 
 
-class NewsSerializer(serializers.ModelSerializer):
+class NewsSerializer(LocalizedModelSerializer):
+    image_srcset = SrcsetField()
     date = serializers.SerializerMethodField(method_name='get_date')
     category_name = serializers.SerializerMethodField(method_name='get_category_name')
 
     class Meta:
         model = models.News
-        fields = ('id', 'slug', 'title_uz', 'title_ru', 'title_en', 'image', 'date', 'category_name')
+        fields = ('id', 'slug', 'title_uz', 'title_ru', 'title_en', 'image', 'image_srcset', 'date', 'category_name')
     
     def get_date(self, obj):
         return obj.created_at.date()
     
     def get_category_name(self, obj):
-        return obj.category.name
+        category = reference.get(models.NewsCategory, obj.category_id)
+        return category.name if category is not None else None
 
 
 class NewsMediaSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField()
+
     class Meta:
         model = models.NewsMedia
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'image_srcset']
 
-class NewsDetailSerializer(serializers.ModelSerializer):
+class NewsDetailSerializer(LocalizedModelSerializer):
+    image_srcset = SrcsetField()
     date = serializers.SerializerMethodField(method_name='get_date')
     media = serializers.SerializerMethodField(method_name='get_media')
 
     class Meta:
         model = models.News
-        fields = ('id', 'slug', 'title_uz', 'title_ru', 'title_en', 'description_uz', 'description_ru', 'description_en', 'image', 'date', 'video', 'link', 'media')
+        fields = ('id', 'slug', 'title_uz', 'title_ru', 'title_en', 'description_uz', 'description_ru', 'description_en', 'image', 'image_srcset', 'date', 'video', 'link', 'media')
     
     def get_date(self, obj):
         return obj.created_at.date()
@@ -44,20 +94,26 @@ class NewsDetailSerializer(serializers.ModelSerializer):
         return NewsMediaSerializer(obj.medias, many=True).data
 
 class PlayerListSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField()
+
     class Meta:
         model = models.Players
         fields = (
-            'id', 'full_name', 'number', 'image', 'gender'
+            'id', 'full_name', 'number', 'image', 'image_srcset', 'gender'
         )
     
 
-class PlayerPosiotionListSerializer(serializers.ModelSerializer):
-    players = PlayerListSerializer(many=True)
+class PlayerPosiotionListSerializer(LocalizedModelSerializer):
+    # positions come from the reference cache, their players grouped by position id in context['players']
+    players = serializers.SerializerMethodField(method_name='get_players')
 
     class Meta:
         model = models.PlayerPosition
         fields = ('id', 'name_uz', 'name_ru', 'name_en', 'players')
 
+    def get_players(self, obj):
+        return PlayerListSerializer(self.context['players'].get(obj.pk, []), many=True).data
+
 
 class PlayerCountrySerializer(serializers.ModelSerializer):
     class Meta:
@@ -65,93 +121,104 @@ class PlayerCountrySerializer(serializers.ModelSerializer):
         fields = ('id', 'flag', 'name')
 
 
-class PlayerPositionSerializer(serializers.ModelSerializer):
+class PlayerPositionSerializer(LocalizedModelSerializer):
     class Meta:
         model = models.PlayerPosition
         fields = ('id', 'name_uz', 'name_ru', 'name_en')
 
 
 class PlayerDetailSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField()
     country = serializers.SerializerMethodField(method_name='get_country')
     position = serializers.SerializerMethodField(method_name='get_position')
 
     class Meta:
         model = models.Players
         fields = (
-            'id', 'full_name', 'number', 'image', 'goal', 'match', 
+            'id', 'full_name', 'number', 'image', 'image_srcset', 'goal', 'match', 
             'assist', 'birth_date', 'height', 'country', 'gender', 'position'
         )
 
     def get_country(self, obj):
-        return PlayerCountrySerializer(obj.country).data
+        return reference_data(PlayerCountrySerializer, models.PlayerCountry, obj.country_id)
     
     def get_position(self, obj):
-        return PlayerPositionSerializer(obj.position).data
+        return reference_data(PlayerPositionSerializer, models.PlayerPosition, obj.position_id)
     
 
 class PartnerLogoListSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField()
+
     class Meta:
         model = models.Partners
-        fields = ('id', 'image', 'link')
+        fields = ('id', 'image', 'image_srcset', 'link')
     
 
-class AboutCompanySerializer(serializers.ModelSerializer):
+class AboutCompanySerializer(LocalizedModelSerializer):
     class Meta:
         model = models.AboutCompany
         fields = ('id', 'description_uz', 'description_ru', 'description_en', 'image')
 
 
-class StadiumSerializer(serializers.ModelSerializer):
+class StadiumSerializer(LocalizedModelSerializer):
     class Meta:
         model = models.Stadium
         fields = ('id', 'image', 'description_uz', 'description_ru', 'description_en')
 
     
-class BannerListSerializer(serializers.ModelSerializer):
+class BannerListSerializer(LocalizedModelSerializer):
+    banner_srcset = SrcsetField(image_field='banner')
+
     class Meta:
         model = models.Banner
-        fields = ('id', 'title_uz', 'title_ru', 'title_en', 'banner', 'link')
+        fields = ('id', 'title_uz', 'title_ru', 'title_en', 'banner', 'banner_srcset', 'link')
 
     
-class AboutAcademySerializer(serializers.ModelSerializer):
+class AboutAcademySerializer(LocalizedModelSerializer):
     class Meta:
         model = models.AboutAcademy
         fields = ('id', 'description_uz', 'description_ru', 'description_en', 'image', 'created_at')
 
 
-class CoachPositionSerializer(serializers.ModelSerializer):
+class CoachPositionSerializer(LocalizedModelSerializer):
     class Meta:
         model = models.CoachPosition
         fields = ('id', 'name_uz', 'name_ru', 'name_en')
 
 
 class CoachListSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField()
     position = serializers.SerializerMethodField(method_name='get_position')
 
     class Meta:
         model = models.Coach
-        fields = ('id', 'full_name', 'position', 'image')
+        fields = ('id', 'full_name', 'position', 'image', 'image_srcset')
 
     def get_position(self, obj):
-        return CoachPositionSerializer(obj.position).data
+        return reference_data(CoachPositionSerializer, models.CoachPosition, obj.position_id)
 
 
-class CoachInformationSerializer(serializers.ModelSerializer):
+class CoachInformationSerializer(LocalizedModelSerializer):
     class Meta:
         model = models.CoachInformation
         fields = ('id', 'name_uz', 'name_ru', 'name_en', 'value_uz', 'value_ru', 'value_en')
 
 
 class CoachDetailSerializer(serializers.ModelSerializer):
-    position = CoachPositionSerializer()
+    image_srcset = SrcsetField()
+    banner_srcset = SrcsetField(image_field='banner')
+    position = serializers.SerializerMethodField(method_name='get_position')
     infos = serializers.SerializerMethodField(method_name='get_infos')
 
     class Meta:
         model = models.Coach
         fields = (
-            'id', 'full_name', 'image', 'banner', 'position', 'infos'
+            'id', 'full_name', 'image', 'image_srcset', 'banner', 'banner_srcset', 'position', 'infos'
         )
 
+    def get_position(self, obj):
+        return reference_data(CoachPositionSerializer, models.CoachPosition, obj.position_id)
+
     def get_infos(self, obj):
         return CoachInformationSerializer(obj.informations, many=True).data
     
@@ -166,14 +233,64 @@ class CoachTableListSerializer(serializers.ModelSerializer):
         )
     
     def get_position(self, obj):
-        return CoachPositionSerializer(obj.position).data
+        return reference_data(CoachPositionSerializer, models.CoachPosition, obj.position_id)
     
 
 class LeaderListSerializer(serializers.ModelSerializer):
+    image_srcset = SrcsetField()
+
     class Meta:
         model = models.Leaders
-        fields = ('id', 'full_name', 'image', 'position', 'country', 'birth_date')
+        fields = ('id', 'full_name', 'image', 'image_srcset', 'position', 'country', 'birth_date')
 
     
+class MatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Match
+        fields = (
+            'id', 'pfl_id', 'season_id', 'round', 'kickoff', 'home_team', 'home_logo', 'home_score',
+            'away_team', 'away_logo', 'away_score', 'stadium', 'finished',
+        )
+
+
 class SearchSerializer(serializers.Serializer):
     search = serializers.CharField(max_length=100)
+
+
+_news_storage = models.News._meta.get_field('image').storage
+_coach_storage = models.Coach._meta.get_field('image').storage
+
+
+class NewsValuesSerializer(projections.ValuesSerializer):
+    fields = {
+        'id': 'id',
+        'slug': 'slug',
+        'title_uz': 'title_uz',
+        'title_ru': 'title_ru',
+        'title_en': 'title_en',
+        'image': projections.ImageColumn('image', _news_storage),
+        'image_srcset': projections.SrcsetColumn('image', _news_storage),
+        'date': projections.DateColumn('created_at'),
+        'category_name': projections.ReferenceColumn('category_id', models.NewsCategory, 'name'),
+    }
+
+
+_coach_position = projections.ReferenceColumn('position_id', models.CoachPosition, ('id', 'name_uz', 'name_ru', 'name_en'))
+
+
+class CoachListValuesSerializer(projections.ValuesSerializer):
+    fields = {
+        'id': 'id',
+        'full_name': 'full_name',
+        'position': _coach_position,
+        'image': projections.ImageColumn('image', _coach_storage),
+        'image_srcset': projections.SrcsetColumn('image', _coach_storage),
+    }
+
+
+class CoachTableListValuesSerializer(projections.ValuesSerializer):
+    fields = {
+        'id': 'id',
+        'full_name': 'full_name',
+        'position': _coach_position,
+    }
@@ -1,6 +1,101 @@
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.core.cache import cache
 
-from common import models
+from common import autocomplete, counters, images, instrumentation, leaderboard, metrics, models, publish, reference, search
+from common.cache import bump_model_version
+from common.client import upstream_request
+from common.tasks import generate_image_derivatives, publish_snapshots
 
+
+# connected before invalidate_model_cache: on_commit callbacks run in order, so the
+# tables are dropped before a request can see the new version and rebuild from them
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_reference_tables(sender, **kwargs):
+    if reference.is_reference(sender):
+        transaction.on_commit(lambda: reference.publish(sender))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_model_cache(sender, **kwargs):
+    if issubclass(sender, models.BaseModel):
+        # a request rebuilding before the commit would cache the old rows under the new version
+        transaction.on_commit(lambda: bump_model_version(sender))
+
+
+@receiver(pre_save)
+def remember_counted_parents(sender, instance, **kwargs):
+    counters.remember_parents(instance)
+
+
+@receiver(post_save)
+def update_counters(sender, instance, created, **kwargs):
+    counters.saved(instance, created)
+
+
+@receiver(post_delete)
+def decrement_counters(sender, instance, **kwargs):
+    counters.deleted(instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def schedule_publish(sender, **kwargs):
+    if publish.paths_for_model(sender):
+        transaction.on_commit(lambda: publish_snapshots.delay(sender._meta.label))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def schedule_search_prewarm(sender, **kwargs):
+    if sender in search.SEARCHED_MODELS:
+        transaction.on_commit(search.schedule_prewarm)
+
+
+@receiver(post_save, sender=models.News)
+def update_news_search_vector(sender, instance, **kwargs):
+    search.update_news_search_vector(models.News.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=models.Players)
+def update_player_leaderboards(sender, instance, **kwargs):
+    transaction.on_commit(lambda: leaderboard.update_player(instance))
+
+
+@receiver(post_delete, sender=models.Players)
+def remove_player_from_leaderboards(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: leaderboard.remove_player(pk))
+
+
+@receiver(post_save)
+def update_autocomplete(sender, instance, **kwargs):
+    if autocomplete.kind_of(sender):
+        transaction.on_commit(lambda: autocomplete.update(instance))
+
+
+@receiver(post_delete)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    if autocomplete.kind_of(sender):
+        pk = instance.pk
+        transaction.on_commit(lambda: autocomplete.remove(sender, pk))
+
+
+@receiver(post_save)
+def schedule_image_derivatives(sender, instance, **kwargs):
+    if issubclass(sender, models.ImageDerivativesModel) and images.needs_derivatives(instance):
+        transaction.on_commit(lambda: generate_image_derivatives.delay(sender._meta.label, str(instance.pk)))
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    connection.execute_wrappers.append(instrumentation.sql_wrapper)
+
+
+@receiver(upstream_request)
+def record_upstream_request(sender, name, latency, status_code, error, **kwargs):
+    instrumentation.record(name, latency, **{name: 1})
+    metrics.observe_upstream(name, latency, status_code, error)
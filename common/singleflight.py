@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import LockError
+
+from common import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _lock_key(key):
+    return f'singleflight:{key}'
+
+
+def _compute(key, compute, timeout, stale_key):
+    value = compute()
+    # None is never cached: a failed rebuild leaves the key for the next caller
+    if value is not None:
+        values = {key: value}
+        if stale_key is not None:
+            values[stale_key] = value
+        cache.set_many(values, timeout)
+    return value
+
+
+def _wait(key):
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(settings.SINGLEFLIGHT_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+async def await_value(aget):
+    """
+    Polls ``aget()`` until it returns a value or SINGLEFLIGHT_WAIT passes, for callers that cannot rebuild themselves.
+    """
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.SINGLEFLIGHT_POLL_INTERVAL)
+        value = await aget()
+        if value is not None:
+            return value
+    return None
+
+
+def get_or_set(key, compute, timeout, stale_key=None, name='cache'):
+    """
+    ``cache.get(key)``; on a miss only the caller holding a short Redis lock
+    runs ``compute``. The others serve the value last stored under
+    ``stale_key`` or wait up to SINGLEFLIGHT_WAIT for the new one, and only
+    rebuild themselves when the holder is too slow.
+
+    Returns ``(value, fresh)``, ``fresh`` is False for a previous value.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+
+    lock = cache.lock(_lock_key(key), timeout=settings.SINGLEFLIGHT_LEASE)
+    if lock.acquire(blocking=False):
+        try:
+            # the previous holder may have stored it between our get and the acquire
+            value = cache.get(key)
+            if value is not None:
+                return value, True
+            metrics.observe_stampede(name, 'computed')
+            return _compute(key, compute, timeout, stale_key), True
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                # the lease ran out during a slow rebuild and someone else holds the lock now
+                logger.warning('single-flight lease for %s expired before the rebuild finished', key)
+
+    if stale_key is not None:
+        value = cache.get(stale_key)
+        if value is not None:
+            metrics.observe_stampede(name, 'stale')
+            return value, False
+
+    value = _wait(key)
+    if value is not None:
+        metrics.observe_stampede(name, 'waited')
+        return value, True
+    metrics.observe_stampede(name, 'timed_out')
+    return _compute(key, compute, timeout, stale_key), True
@@ -0,0 +1,49 @@
+from celery import shared_task
+from django.apps import apps
+
+from common import images, matches, pfl, publish, search
+from common.cache import bump_model_version
+
+
+@shared_task
+def refresh_pfl_snapshot(name):
+    snapshot = pfl.refresh_snapshot(name)
+    if name == pfl.CALENDAR:
+        # the calendar is fetched once for both the proxied snapshot and the Match table
+        matches.upsert(snapshot['data'])
+    return snapshot['version']
+
+
+@shared_task
+def generate_image_derivatives(model_label, pk):
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+
+    derivatives = {}
+    for field_name in instance.derivative_fields:
+        field_file = getattr(instance, field_name)
+        if field_file:
+            derivatives[field_name] = images.generate_derivatives(field_file)
+        else:
+            derivatives[field_name] = {'source': None, 'sizes': {}}
+    # update() skips post_save, so the version is bumped by hand
+    model.objects.filter(pk=pk).update(derivatives=derivatives)
+    bump_model_version(model)
+    publish.publish_for_model(model)
+    # copies of a replaced or cleared image go only once nothing points at them any more
+    for field_name in instance.derivative_fields:
+        images.delete_stale_derivatives(
+            instance.derivatives.get(field_name), derivatives[field_name], getattr(instance, field_name).storage,
+        )
+
+
+@shared_task
+def publish_snapshots(model_label):
+    publish.publish_for_model(apps.get_model(model_label))
+
+
+@shared_task
+def prewarm_search():
+    return search.prewarm()
@@ -1,3 +1,726 @@
-from django.test import TestCase
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.http import http_date
+
+from common import (
+    autocomplete, counters, leaderboard, matches, models, pfl, reference, routers, search, serializers, singleflight,
+    views,
+)
+from common.cache import bump_model_version, get_model_versions
+from common.client import AsyncUpstreamClient, CircuitOpenError, UpstreamClient, UpstreamError
+from common.instrumentation import QueryBudgetExceeded
+from common.middleware import ReplicaRoutingMiddleware
+from common.text import normalize
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TESTDATA = os.path.join(os.path.dirname(__file__), 'testdata')
+
+
+def calendar_games():
+    # hand-written in the shape parse_match reads, not recorded from PFL, so these tests only pin
+    # that guess; replace it with manage.py ingest_matches --dry-run --record common/testdata/pfl_calendar.json
+    with open(os.path.join(TESTDATA, 'pfl_calendar.json')) as f:
+        return matches.calendar_games(json.load(f))
+
+
+def create_player(country, position, **fields):
+    return models.Players.objects.create(**{
+        'full_name': 'Aziz Karimov', 'image': 'players/aziz.jpg', 'number': 7, 'goal': 0, 'match': 0, 'assist': 0,
+        'birth_date': date(2000, 1, 1), 'height': '180', 'gender': models.MAN, 'country': country, 'position': position,
+        **fields,
+    })
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # (status, delay in seconds) answered in order, then 200s
+    responses = []
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        status, delay = self.responses.pop(0) if self.responses else (200, 0)
+        time.sleep(delay)
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{"data": {"table": []}}')
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up on a slow answer
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UpstreamClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        StubHandler.responses = []
+        StubHandler.hits = 0
+
+    def upstream(self, client_class=UpstreamClient):
+        return client_class(
+            'stub', self.base_url, read_timeout=0.2, retries=1, backoff=0, failure_threshold=2, reset_timeout=60,
+        )
+
+    def end_cooldown(self, client):
+        cache.delete(client.breaker._key('open'))
+
+    def test_ok(self):
+        self.assertEqual(self.upstream().get('/').json(), {'data': {'table': []}})
+
+    def test_timeout_is_retried_then_raised(self):
+        StubHandler.responses = [(200, 0.5), (200, 0.5)]
+        with self.assertRaises(UpstreamError):
+            self.upstream().get('/')
+        self.assertEqual(StubHandler.hits, 2)
+
+    def test_retry_status_is_retried(self):
+        StubHandler.responses = [(503, 0)]
+        self.assertEqual(self.upstream().get('/').status_code, 200)
+        self.assertEqual(StubHandler.hits, 2)
+
+    def test_client_error_does_not_open_breaker(self):
+        client = self.upstream()
+        StubHandler.responses = [(404, 0)] * 3
+        for _ in range(3):
+            with self.assertRaises(UpstreamError):
+                client.get('/')
+        self.assertFalse(client.breaker.is_open())
+
+    def test_server_errors_open_breaker(self):
+        client = self.upstream()
+        StubHandler.responses = [(500, 0), (429, 0)]
+        for _ in range(2):
+            with self.assertRaises(UpstreamError):
+                client.get('/')
+        self.assertTrue(client.breaker.is_open())
+        with self.assertRaises(CircuitOpenError):
+            client.get('/')
+        self.assertEqual(StubHandler.hits, 2)
+
+    def test_half_open_failure_reopens_at_once(self):
+        client = self.upstream()
+        StubHandler.responses = [(500, 0), (500, 0), (500, 0)]
+        for _ in range(3):
+            if client.breaker.is_open():
+                self.end_cooldown(client)
+            with self.assertRaises(UpstreamError):
+                client.get('/')
+        self.assertTrue(client.breaker.is_open())
+
+    def test_half_open_success_closes(self):
+        client = self.upstream()
+        StubHandler.responses = [(500, 0), (500, 0)]
+        for _ in range(2):
+            with self.assertRaises(UpstreamError):
+                client.get('/')
+        self.end_cooldown(client)
+        self.assertEqual(client.get('/').status_code, 200)
+
+        # closed again, a single failure no longer opens it
+        StubHandler.responses = [(500, 0)]
+        with self.assertRaises(UpstreamError):
+            client.get('/')
+        self.assertFalse(client.breaker.is_open())
+
+    async def test_async_server_errors_open_breaker(self):
+        client = self.upstream(AsyncUpstreamClient)
+        StubHandler.responses = [(500, 0), (500, 0)]
+        for _ in range(2):
+            with self.assertRaises(UpstreamError):
+                await client.get('/')
+        with self.assertRaises(CircuitOpenError):
+            await client.get('/')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PflSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_refresh_saves_and_releases_the_lock(self):
+        cache.add('pfl:table:refreshing', 1)
+        with mock.patch.object(pfl, 'fetch', return_value=[{'club': 'Xorazm'}]):
+            snapshot = pfl.refresh_snapshot(pfl.TABLE)
+        self.assertEqual(cache.get(f'pfl:table:{snapshot["version"]}')['data'], [{'club': 'Xorazm'}])
+        self.assertIsNone(cache.get('pfl:table:refreshing'))
+
+    def test_failed_refresh_releases_the_lock(self):
+        cache.add('pfl:table:refreshing', 1)
+        with mock.patch.object(pfl, 'fetch', side_effect=UpstreamError('down')):
+            with self.assertRaises(UpstreamError):
+                pfl.refresh_snapshot(pfl.TABLE)
+        self.assertIsNone(cache.get('pfl:table:refreshing'))
+
+    async def test_failed_first_fetch_releases_the_lock(self):
+        with mock.patch.object(pfl, 'afetch', side_effect=UpstreamError('down')):
+            with self.assertLogs('common.pfl', 'WARNING'):
+                self.assertIsNone(await pfl.aget_snapshot(pfl.TABLE))
+        self.assertIsNone(await cache.aget('pfl:table:refreshing'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = routers.ReplicaRouter()
+
+    def request(self, request, status=200, write=False):
+        # answers the database the view would have read from
+        def view(request):
+            if write:
+                self.router.db_for_write(models.News)
+            return HttpResponse(self.router.db_for_read(models.News), status=status)
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_api_reads_go_to_a_replica(self):
+        self.assertEqual(self.request(self.factory.get('/api/v1/common/news/category/list/')).content, b'replica_1')
+        self.assertEqual(self.request(self.factory.get('/admin/')).content, b'default')
+        # nothing leaks into whatever runs after the request
+        self.assertEqual(self.router.db_for_read(models.News), 'default')
+
+    def test_a_write_pins_the_writer_to_the_primary(self):
+        response = self.request(self.factory.post('/api/v1/common/search/'))
+        self.assertEqual(response.content, b'default')
+        self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+
+        request = self.factory.get('/api/v1/common/news/category/list/')
+        request.COOKIES[routers.PIN_COOKIE] = '1'
+        self.assertEqual(self.request(request).content, b'default')
+
+    def test_failed_write_does_not_pin(self):
+        response = self.request(self.factory.post('/api/v1/common/search/'), status=400)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_reads_after_a_write_in_the_same_request_use_the_primary(self):
+        self.assertEqual(self.request(self.factory.get('/api/v1/common/players/'), write=True).content, b'default')
+
+    def test_recently_changed_model_reads_from_the_primary(self):
+        token = routers.read_from_replica()
+        try:
+            routers.pin_primary_if_changed(time.time() - settings.REPLICA_PIN_SECONDS - 1)
+            self.assertEqual(self.router.db_for_read(models.News), 'replica_1')
+            routers.pin_primary_if_changed(time.time() - 1)
+            self.assertEqual(self.router.db_for_read(models.News), 'default')
+        finally:
+            routers.reset(token)
+
+
+@override_settings(SINGLEFLIGHT_WAIT=0.3, SINGLEFLIGHT_POLL_INTERVAL=0.01)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.key = f'test:singleflight:{uuid.uuid4().hex}'
+        self.stale_key = f'{self.key}:latest'
+        self.addCleanup(cache.delete_many, [self.key, self.stale_key])
+        self.calls = 0
+
+    def compute(self, value='fresh', delay=0):
+        self.calls += 1
+        time.sleep(delay)
+        return value
+
+    def get(self, **kwargs):
+        return singleflight.get_or_set(self.key, lambda: self.compute(**kwargs), 60, stale_key=self.stale_key)
+
+    def hold_lock(self):
+        lock = cache.lock(singleflight._lock_key(self.key), timeout=5)
+        self.assertTrue(lock.acquire(blocking=False))
+        self.addCleanup(lock.release)
+
+    def test_miss_computes_once_and_keeps_a_stale_copy(self):
+        self.assertEqual(self.get(), ('fresh', True))
+        self.assertEqual(self.get(), ('fresh', True))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.get(self.stale_key), 'fresh')
+
+    def test_none_is_not_cached(self):
+        self.assertEqual(self.get(value=None), (None, True))
+        self.assertEqual(self.get(), ('fresh', True))
+        self.assertEqual(self.calls, 2)
+
+    def test_others_serve_the_stale_value_while_one_rebuilds(self):
+        cache.set(self.stale_key, 'old')
+        self.hold_lock()
+        self.assertEqual(self.get(), ('old', False))
+        self.assertEqual(self.calls, 0)
+
+    def test_others_wait_for_the_rebuild_without_a_stale_value(self):
+        self.hold_lock()
+        timer = threading.Timer(0.05, cache.set, (self.key, 'theirs'))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertEqual(self.get(), ('theirs', True))
+        self.assertEqual(self.calls, 0)
+
+    def test_a_slow_holder_is_not_waited_for_forever(self):
+        self.hold_lock()
+        self.assertEqual(self.get(), ('fresh', True))
+        self.assertEqual(self.calls, 1)
+
+    @override_settings(SINGLEFLIGHT_LEASE=0.1)
+    def test_expired_lease_still_returns_the_value(self):
+        with self.assertLogs('common.singleflight', 'WARNING'):
+            self.assertEqual(self.get(delay=0.3), ('fresh', True))
+        # the lease is gone, the next miss can take the lock again
+        lock = cache.lock(singleflight._lock_key(self.key), timeout=1)
+        self.assertTrue(lock.acquire(blocking=False))
+        lock.release()
+
+
+# DEBUG as the environment sets it in production, a truthy string
+@override_settings(QUERY_BUDGET_RAISE=True, DEBUG='False', INTERNAL_IPS=[])
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        # versions are bumped on commit, which never comes inside a TestCase
+        reference.invalidate()
+        for model in (models.Coach, models.CoachPosition, models.CoachInformation):
+            bump_model_version(model)
+        position = models.CoachPosition.objects.create(name_uz='Bosh murabbiy')
+        coach = models.Coach.objects.create(
+            full_name='Aziz Karimov', image='coaches/aziz.jpg', position=position, gender=models.MAN,
+        )
+        for i in range(3):
+            models.CoachInformation.objects.create(coach=coach, name_uz=f'Fakt {i}', value_uz=str(i))
+        self.url = f'/api/v1/common/coach/{coach.pk}/'
+
+    def test_coach_detail_stays_within_budget(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['infos']), 3)
+
+    def test_exceeded_budget_fails_the_request(self):
+        with mock.patch.object(views.CoachDetailApiView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.url)
+
+    def test_server_timing_only_for_internal_ips(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+        with override_settings(INTERNAL_IPS=['127.0.0.1']):
+            self.assertIn('Server-Timing', self.client.get(self.url))
+
+
+class ReferenceTests(TestCase):
+    def setUp(self):
+        # no listener thread, so nothing but the test invalidates the tables
+        patcher = mock.patch.object(reference, '_ensure_listener')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        reference.invalidate()
+        self.category = models.NewsCategory.objects.create(name_uz='Jamoa')
+
+    def test_rows_are_read_from_memory(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(reference.get(models.NewsCategory, self.category.pk).name, 'Jamoa')
+            self.assertEqual(reference.get(models.NewsCategory, self.category.pk).name, 'Jamoa')
+
+    def test_row_missing_from_the_table_is_read_and_the_table_reloaded(self):
+        reference.get(models.NewsCategory, self.category.pk)
+        # created elsewhere, its invalidation has not arrived
+        other = models.NewsCategory.objects.create(name_uz='Akademiya')
+        with self.assertNumQueries(1):
+            self.assertEqual(reference.get(models.NewsCategory, other.pk).name, 'Akademiya')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(reference.all_rows(models.NewsCategory)), 2)
+        with self.assertNumQueries(0):
+            reference.get(models.NewsCategory, other.pk)
+
+    def test_unknown_pk_keeps_the_table(self):
+        reference.get(models.NewsCategory, self.category.pk)
+        with self.assertNumQueries(1):
+            self.assertIsNone(reference.get(models.NewsCategory, uuid.uuid4()))
+        with self.assertNumQueries(0):
+            reference.get(models.NewsCategory, self.category.pk)
+
+    def test_publish_drops_the_table(self):
+        reference.get(models.NewsCategory, self.category.pk)
+        models.NewsCategory.objects.filter(pk=self.category.pk).update(name_uz='Yoshlar')
+        with mock.patch.object(reference, 'get_redis_connection') as connection:
+            reference.publish(models.NewsCategory)
+        connection.return_value.publish.assert_called_once_with(reference.CHANNEL, 'common.NewsCategory')
+        self.assertEqual(reference.get(models.NewsCategory, self.category.pk).name, 'Yoshlar')
+
+    def test_load_overlapping_an_invalidation_is_not_kept(self):
+        load = reference._load
+
+        def invalidated_while_loading(model):
+            rows = load(model)
+            if loads.call_count == 1:
+                models.NewsCategory.objects.filter(pk=self.category.pk).update(name_uz='Yoshlar')
+                reference.invalidate('common.NewsCategory')
+            return rows
+
+        with mock.patch.object(reference, '_load', side_effect=invalidated_while_loading) as loads:
+            self.assertEqual(reference.get(models.NewsCategory, self.category.pk).name, 'Yoshlar')
+        self.assertEqual(loads.call_count, 2)
+
+    def test_serializer_tolerates_a_deleted_category(self):
+        news = models.News(title_uz='Yangilik', category_id=uuid.uuid4(), created_at=datetime(2026, 1, 1))
+        self.assertIsNone(serializers.NewsSerializer().get_category_name(news))
+
+
+class CacheResponseTests(TestCase):
+    url = '/api/v1/common/news/category/list/'
+
+    def setUp(self):
+        bump_model_version(models.NewsCategory)
+        models.NewsCategory.objects.create(name_uz='Jamoa', name_ru='Команда', name_en='Team')
+
+    def test_version_is_bumped_on_commit(self):
+        coach = models.Coach.objects.create(full_name='Aziz Karimov', image='coaches/aziz.jpg', gender=models.MAN,
+                                            position=models.CoachPosition.objects.create(name_uz='Bosh murabbiy'))
+        before = get_model_versions(models.CoachInformation)
+        with self.captureOnCommitCallbacks() as callbacks:
+            models.CoachInformation.objects.create(coach=coach, name_uz='Fakt', value_uz='1')
+            self.assertEqual(get_model_versions(models.CoachInformation), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_model_versions(models.CoachInformation), before)
+
+    def test_etag_answers_304_until_the_version_moves(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        bump_model_version(models.NewsCategory)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_last_modified_is_sent_once_its_second_is_over(self):
+        start = time.time() // 1
+        with mock.patch('common.cache.time.time', return_value=start + 0.2):
+            bump_model_version(models.NewsCategory)
+            self.assertNotIn('Last-Modified', self.client.get(self.url))
+            # a client holding this second's date may have read the row before the change
+            self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(start)).status_code, 200)
+        with mock.patch('common.cache.time.time', return_value=start + 1.5):
+            last_modified = self.client.get(self.url)['Last-Modified']
+            self.assertEqual(last_modified, http_date(start + 1))
+            self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_languages_are_cached_apart(self):
+        ru = self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='ru')
+        en = self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual((ru.json()[0]['name'], en.json()[0]['name']), ('Команда', 'Team'))
+        self.assertNotEqual(ru['ETag'], en['ETag'])
+        self.assertEqual(self.client.get(f'{self.url}?lang=en', HTTP_ACCEPT_LANGUAGE='ru').json()[0]['name'], 'Team')
+        self.assertIn('Accept-Language', ru['Vary'])
+        self.assertIn('Cookie', ru['Vary'])
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.uzbekistan = models.PlayerCountry.objects.create(name='Oʻzbekiston', flag='flags/uz.png')
+        self.brazil = models.PlayerCountry.objects.create(name='Braziliya', flag='flags/br.png')
+        self.position = models.PlayerPosition.objects.create(name_uz='Hujumchi')
+
+    def counts(self):
+        return list(
+            models.PlayerCountry.objects.filter(pk__in=[self.uzbekistan.pk, self.brazil.pk])
+            .order_by('name').values_list('players_count', flat=True)
+        )
+
+    def test_create_and_delete(self):
+        player = create_player(self.uzbekistan, self.position)
+        create_player(self.uzbekistan, self.position)
+        self.assertEqual(self.counts(), [0, 2])
+        player.delete()
+        self.assertEqual(self.counts(), [0, 1])
+
+    def test_moving_to_another_parent(self):
+        player = create_player(self.uzbekistan, self.position)
+        player.country = self.brazil
+        player.save()
+        self.assertEqual(self.counts(), [1, 0])
+        player.goal = 3
+        player.save()
+        self.assertEqual(self.counts(), [1, 0])
+
+    def test_drifted_counter_stops_at_zero(self):
+        player = create_player(self.uzbekistan, self.position)
+        models.PlayerCountry.objects.update(players_count=0)
+        player.delete()
+        self.assertEqual(self.counts(), [0, 0])
+
+    def test_parent_versions_are_bumped_on_commit(self):
+        before = get_model_versions(models.PlayerCountry)
+        with self.captureOnCommitCallbacks() as callbacks:
+            counters._bump_parents(models.Players)
+        self.assertEqual(get_model_versions(models.PlayerCountry), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_model_versions(models.PlayerCountry), before)
+
+    def test_reconcile_fixes_drift(self):
+        create_player(self.uzbekistan, self.position)
+        models.PlayerCountry.objects.filter(pk=self.uzbekistan.pk).update(players_count=5)
+        models.PlayerCountry.objects.filter(pk=self.brazil.pk).update(players_count=2)
+        drift = counters.reconcile(fix=False)
+        self.assertEqual(
+            sorted((pk, stored, actual) for model, counter, pk, stored, actual in drift),
+            sorted([(self.uzbekistan.pk, 5, 1), (self.brazil.pk, 2, 0)]),
+        )
+        self.assertEqual(self.counts(), [2, 5])
+        self.assertEqual(len(counters.reconcile()), 2)
+        self.assertEqual(self.counts(), [0, 1])
+        self.assertEqual(counters.reconcile(fix=False), [])
+
+
+def delete_redis_keys(connection, pattern):
+    keys = list(connection.scan_iter(pattern))
+    if keys:
+        connection.delete(*keys)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.redis = autocomplete._connection()
+        delete_redis_keys(self.redis, 'autocomplete:*')
+        self.addCleanup(delete_redis_keys, self.redis, 'autocomplete:*')
+        country = models.PlayerCountry.objects.create(name='Oʻzbekiston', flag='flags/uz.png')
+        position = models.PlayerPosition.objects.create(name_uz='Hujumchi')
+        self.aziz = create_player(country, position)
+        self.otkir = create_player(country, position, full_name='Oʻtkir Gʻulomov', number=9)
+
+    def names(self, text):
+        return [doc['full_name'] for doc in autocomplete.suggest(text)]
+
+    def test_every_word_is_a_prefix(self):
+        autocomplete.update(self.aziz)
+        self.assertEqual(self.names('kar'), ['Aziz Karimov'])
+        self.assertEqual(self.names('Aziz K'), ['Aziz Karimov'])
+        self.assertEqual(self.names('zi'), [])
+        self.assertEqual(self.names('a'), [])
+
+    def test_apostrophes_are_folded(self):
+        autocomplete.update(self.otkir)
+        for text in ("o'tkir", 'oʻtkir', 'gulomov', 'O‘tkir G‘u'):
+            self.assertEqual(self.names(text), ['Oʻtkir Gʻulomov'])
+
+    def test_rename_drops_the_old_terms(self):
+        autocomplete.update(self.aziz)
+        self.aziz.full_name = 'Aziz Toshpulatov'
+        autocomplete.update(self.aziz)
+        self.assertEqual(self.names('kar'), [])
+        self.assertEqual(self.names('tosh'), ['Aziz Toshpulatov'])
+        self.assertEqual(self.names('aziz'), ['Aziz Toshpulatov'])
+
+    def test_remove(self):
+        autocomplete.update(self.aziz)
+        autocomplete.remove(models.Players, self.aziz.pk)
+        self.assertEqual(self.names('kar'), [])
+        self.assertEqual(self.redis.zcard(autocomplete.INDEX_KEY), 0)
+        self.assertFalse(self.redis.exists(f'autocomplete:members:players:{self.aziz.pk}'))
+
+    def test_rebuild_matches_the_database(self):
+        autocomplete.update(self.aziz)
+        autocomplete.update(self.otkir)
+        # renamed and deleted without their signals reaching the index
+        models.Players.objects.filter(pk=self.aziz.pk).update(full_name='Aziz Toshpulatov')
+        models.Players.objects.filter(pk=self.otkir.pk).delete()
+
+        self.assertEqual(autocomplete.rebuild(), 1)
+        self.assertEqual(self.names('kar'), [])
+        self.assertEqual(self.names('tosh'), ['Aziz Toshpulatov'])
+        self.assertEqual(self.names('otkir'), [])
+        self.assertFalse(self.redis.exists(f'autocomplete:members:players:{self.otkir.pk}'))
+        # only the live keys are left, the rebuild's own were renamed or deleted
+        self.assertEqual(list(self.redis.scan_iter(f'{autocomplete.INDEX_KEY}:*')), [])
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.redis = leaderboard._connection()
+        delete_redis_keys(self.redis, 'leaderboard:*')
+        self.addCleanup(delete_redis_keys, self.redis, 'leaderboard:*')
+        country = models.PlayerCountry.objects.create(name='Oʻzbekiston', flag='flags/uz.png')
+        position = models.PlayerPosition.objects.create(name_uz='Hujumchi')
+        self.aziz = create_player(country, position, goal=5, assist=1, match=10)
+        self.jasur = create_player(country, position, full_name='Jasur Xasanov', goal=8, assist=0, match=0)
+        self.malika = create_player(country, position, full_name='Malika Oripova', goal=3, assist=6, match=4, gender=models.WOMEN)
+
+    def board(self, stat, squad=leaderboard.ALL):
+        return leaderboard.top(stat, squad)
+
+    def test_first_read_builds_the_boards_in_order(self):
+        self.assertEqual(
+            self.board('goals'), [(str(self.jasur.pk), 8), (str(self.aziz.pk), 5), (str(self.malika.pk), 3)],
+        )
+        self.assertEqual(self.board('contributions')[0], (str(self.malika.pk), 9))
+        self.assertEqual(self.board('goals', 'women'), [(str(self.malika.pk), 3)])
+
+    def test_players_below_the_minimum_matches_have_no_ratio(self):
+        self.assertEqual(self.board('goals_per_match'), [(str(self.malika.pk), 0.75), (str(self.aziz.pk), 0.5)])
+
+    def test_update_moves_a_player_between_squads(self):
+        leaderboard.rebuild()
+        self.aziz.gender = models.U21
+        self.aziz.goal = 10
+        leaderboard.update_player(self.aziz)
+        self.assertEqual(self.board('goals', 'man'), [(str(self.jasur.pk), 8)])
+        self.assertEqual(self.board('goals', 'u21'), [(str(self.aziz.pk), 10)])
+        self.assertEqual(self.board('goals')[0], (str(self.aziz.pk), 10))
+
+    def test_update_before_the_first_build_builds_everything(self):
+        leaderboard.update_player(self.aziz)
+        self.assertEqual(len(self.board('goals')), 3)
+
+    def test_remove(self):
+        leaderboard.rebuild()
+        leaderboard.remove_player(self.jasur.pk)
+        self.assertNotIn(str(self.jasur.pk), [player_id for player_id, score in self.board('goals')])
+        self.assertEqual(self.board('goals', 'man'), [(str(self.aziz.pk), 5)])
+
+
+class NewsListTests(TestCase):
+    def test_unknown_category_is_a_404(self):
+        response = self.client.get(f'/api/v1/common/news/category/{uuid.uuid4()}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Category not found'})
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_apostrophes_case_and_punctuation_fold(self):
+        for text in ("O'zbekiston  Gʻalaba!", 'oʻzbekiston g‘alaba', 'OZBEKISTON-GALABA'):
+            self.assertEqual(normalize(text), 'ozbekiston galaba')
+
+    def test_accents_are_kept(self):
+        # the indexed text is not unaccented either
+        self.assertEqual(normalize('Ёркин Йўлдошев'), 'ёркин йўлдошев')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'trigram indexes need postgres')
+class NameSearchIndexTests(TestCase):
+    def test_name_search_uses_the_trigram_index(self):
+        for model, index in (
+            (models.Players, 'players_folded_name_trgm'),
+            (models.Coach, 'coach_folded_name_trgm'),
+            (models.Leaders, 'leaders_folded_name_trgm'),
+        ):
+            queryset = search._by_name(model.objects.all(), 'karimov', 'players', 5, id='id')
+            self.assertNotIn('UPPER(', str(queryset.query))
+            with connection.cursor() as cursor:
+                # a few empty rows are cheaper to scan, only an unusable index makes the planner scan now
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            self.assertIn(index, queryset.explain())
+
+
+class MatchParsingTests(SimpleTestCase):
+    def parse(self, index):
+        return matches.parse_match(calendar_games()[index], 10)
+
+    def test_finished_game(self):
+        match = self.parse(0)
+        self.assertEqual(
+            (match.pfl_id, match.round, match.home_team, match.away_team, match.home_score, match.away_score),
+            (4801, '1', 'Xorazm', 'Navbahor', 2, 1),
+        )
+        self.assertTrue(match.finished)
+        self.assertEqual(match.kickoff, datetime(2026, 3, 1, 19, 0))
+
+    def test_goalless_draw_is_a_result(self):
+        match = self.parse(1)
+        self.assertTrue(match.finished)
+        self.assertEqual((match.home_score, match.away_score), (0, 0))
+        # kickoffs are stored in Tashkent time
+        self.assertEqual(match.kickoff, datetime(2026, 3, 8, 19, 0))
+        self.assertEqual(match.home_logo, '')
+
+    def test_live_game_has_a_score_but_is_not_finished(self):
+        match = self.parse(2)
+        self.assertFalse(match.finished)
+        self.assertEqual((match.home_score, match.away_score), (1, 0))
+
+    def test_scheduled_game_with_0_0_is_not_a_result(self):
+        match = self.parse(3)
+        self.assertFalse(match.finished)
+        self.assertEqual((match.home_score, match.away_score), (None, None))
+
+    def test_game_without_a_date(self):
+        self.assertIsNone(self.parse(4).kickoff)
+
+    def test_unexpected_shape_raises(self):
+        with self.assertRaises(KeyError):
+            matches.parse_match({'id': 1, 'status': 'finished', 'home_team': 'Xorazm'}, 10)
+
+
+class MatchTests(TestCase):
+    def setUp(self):
+        bump_model_version(models.Match)
+
+    def test_upsert_skips_unchanged_and_malformed_games(self):
+        games = calendar_games() + [{'id': 9999, 'status': 'finished'}]
+        with self.assertLogs('common.matches', 'WARNING'):
+            self.assertEqual(matches.upsert(games, 10), 5)
+        with self.assertLogs('common.matches', 'WARNING'):
+            self.assertEqual(matches.upsert(games, 10), 0)
+
+        games[3] = {**games[3], 'status': 'finished', 'homeScore': 1, 'awayScore': 3}
+        with self.assertLogs('common.matches', 'WARNING'):
+            self.assertEqual(matches.upsert(games, 10), 1)
+        self.assertEqual(models.Match.objects.count(), 5)
+        self.assertEqual(matches.last_results(1)[0].pfl_id, 4838)
+
+    def test_calendar_of_unknown_shape_raises_and_writes_nothing(self):
+        games = [{'id': 1, 'home_team': 'Xorazm'}, {'id': 2, 'home_team': 'Nasaf'}]
+        with self.assertLogs('common.matches', 'WARNING'), self.assertRaises(matches.CalendarShapeError):
+            matches.upsert(games, 10)
+        self.assertFalse(models.Match.objects.exists())
+
+    def test_ingest_dry_run_only_parses(self):
+        payload = {'data': {'table': calendar_games()}}
+        out = StringIO()
+        with mock.patch.object(matches, 'fetch_calendar', return_value=payload):
+            call_command('ingest_matches', '--dry-run', stdout=out)
+            self.assertIn('5 of 5 games parsed', out.getvalue())
+            self.assertFalse(models.Match.objects.exists())
+
+            payload['data']['table'] = [{'id': 1}]
+            with self.assertLogs('common.matches', 'WARNING'), self.assertRaises(CommandError):
+                call_command('ingest_matches', stdout=out)
+
+    def test_next_match_etag_moves_with_the_clock(self):
+        models.Match.objects.create(
+            pfl_id=1, tournament_id=1, season_id=10, kickoff=datetime.now() + timedelta(days=1),
+            home_team='Xorazm', away_team='Nasaf',
+        )
+        url = '/api/v1/common/matches/next/'
+        start = time.time() // 60 * 60
+        with mock.patch('common.cache.time.time', return_value=start):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with mock.patch('common.cache.time.time', return_value=start + 60):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,37 @@
+import re
+import unicodedata
+
+from django.db.models import Func, TextField, Value
+
+# every way the Uzbek oʻ/gʻ letter and the tutuq belgisi get typed
+APOSTROPHES = "'`‘’ʻʼ"
+
+_APOSTROPHE_RE = re.compile(f'[{APOSTROPHES}]')
+
+
+def fold_apostrophes(text):
+    """
+    Drops every apostrophe variant, so O'zbekiston, Oʻzbekiston and O‘zbekiston
+    all become Ozbekiston. Search and autocomplete fold both the query and the
+    indexed text with it, or with ``FoldApostrophes`` in SQL.
+    """
+    return _APOSTROPHE_RE.sub('', text)
+
+
+def normalize(text):
+    """
+    The one normal form of searched text: NFC, casefolded, apostrophes
+    dropped, words joined by single spaces. Search queries, their cache keys
+    and autocomplete terms all go through it, so a query matches the same way
+    everywhere. Accents stay, postgres has no unaccent() to match a stripped query.
+    """
+    text = fold_apostrophes(unicodedata.normalize('NFC', text).casefold())
+    return ' '.join(re.findall(r'\w+', text))
+
+
+class FoldApostrophes(Func):
+    function = 'translate'
+    output_field = TextField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(expression, Value(APOSTROPHES), Value(''), **extra)
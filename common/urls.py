@@ -1,6 +1,6 @@
 from django.urls import path
 
-from common import views
+from common import async_views, views
 
 urlpatterns = [
     # news urls
@@ -8,10 +8,16 @@ urlpatterns = [
     path('news/category/<uuid:id>/', views.NewsListApiView.as_view()),
     path('news/<slug:slug>/', views.NewsDetailApiView.as_view()),
     # player urls
+    path('players/', views.PlayerRosterApiView.as_view()),
     path('players/man/', views.PlayerManListApiView.as_view()),
     path('players/women/', views.PlayerWomanListApiView.as_view()),
     path('players/u19/', views.PlayerU19ListApiView.as_view()),
     path('players/u21/', views.PlayerU21ListApiView.as_view()),
+    path('players/leaderboard/', views.PlayerLeaderboardApiView.as_view()),
+    path('autocomplete/', views.AutocompleteApiView.as_view()),
+    path('matches/next/', views.MatchNextApiView.as_view()),
+    path('matches/results/', views.MatchResultsApiView.as_view()),
+    path('matches/list/', views.MatchListApiView.as_view()),
 
     path('players/<uuid:id>/', views.PlayerDetailApiView.as_view()),
     
@@ -34,8 +40,9 @@ urlpatterns = [
 
     # leaders
     path('leaders/list/', views.LeaderListApiView.as_view()),
-    path('search/', views.SearchApiView.as_view(), name='search_api_view'),
+    path('search/', async_views.SearchView.as_view(), name='search_api_view'),
 
-    path("table/", views.GetTableApiView.as_view()),
-    path("matches/", views.TableApiView.as_view()),
+    path("home/", async_views.HomeView.as_view()),
+    path("table/", async_views.TableView.as_view()),
+    path("matches/", async_views.MatchesView.as_view()),
 ]
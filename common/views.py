@@ -1,103 +1,260 @@
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page 
-from django.core.cache import cache
-from django.db.models import Prefetch
+from django.conf import settings
+from django.utils.dateparse import parse_date
 
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.generics import ListAPIView, RetrieveAPIView, GenericAPIView
-import requests
-from datetime import datetime
-import json
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from datetime import timedelta
 
-from common import models, serializers, pagination
+from common import models, serializers, pagination, localization, leaderboard, autocomplete, reference, matches
+from common.cache import cache_response
 
 class NewsCategoryListApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='news_category_list_cache'))
+    @method_decorator(cache_response(models.NewsCategory, key_prefix='news_category_list_cache'))
     def get(self, request):
-        categories = models.NewsCategory.objects.values('id', 'name_uz', 'name_ru', 'name_en').order_by('created_at')
+        categories = localization.defer_unused(
+            models.NewsCategory.objects.only('id', 'name_uz', 'name_ru', 'name_en', 'news_count').order_by('created_at')
+        )
         serializer = serializers.NewsCategorySerializer(categories, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 
 class NewsListApiView(ListAPIView):
     serializer_class = serializers.NewsSerializer
-    pagination_class = pagination.CustomPagination
+    query_budget = 3
+    pagination_class = pagination.NewsCursorPagination
+
+    @property
+    def paginator(self):
+        # ?pagination=page (or a plain ?page=N) keeps the old page-number contract
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'page' or 'page' in params:
+                self._paginator = pagination.CustomPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_queryset(self):
-        category = models.NewsCategory.objects.filter(id=self.kwargs.get('id'))
-        if not category:
-            return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
-        return models.News.objects.filter(category_id=self.kwargs.get('id')).select_related('category').order_by('-created_at')
+        # list() projects whatever this returns, so a missing category has to raise
+        if reference.get(models.NewsCategory, self.kwargs.get('id')) is None:
+            raise NotFound({'error': 'Category not found'})
+        return models.News.objects.filter(category_id=self.kwargs.get('id')).order_by('-created_at')
    
-    # @method_decorator(cache_page(2*60, key_prefix='news_list_cache'))
+    @method_decorator(cache_response(models.News, models.NewsCategory, key_prefix='news_list_cache'))
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
+        queryset = serializers.NewsValuesSerializer.project(self.get_queryset())
+        context = self.get_serializer_context()
         page = self.paginate_queryset(queryset)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
+            serializer = serializers.NewsValuesSerializer(page, context=context)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = serializers.NewsValuesSerializer(queryset, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class NewsDetailApiView(RetrieveAPIView):
     serializer_class = serializers.NewsDetailSerializer
+    query_budget = 2
 
-    # @method_decorator(cache_page(2*60, key_prefix='news_detail_cache'))
+    @method_decorator(cache_response(models.News, models.NewsMedia, key_prefix='news_detail_cache'))
     def retrieve(self, request, *args, **kwargs):
-        news = models.News.objects.filter(slug=self.kwargs.get('slug')).first()
+        news = localization.defer_unused(models.News.objects.filter(slug=self.kwargs.get('slug'))).first()
         if not news:
             return Response({'error': 'News not found'}, status=status.HTTP_404_NOT_FOUND)
         serializer = serializers.NewsDetailSerializer(news)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 
+def _players_by_position(gender):
+    players = {}
+    for player in models.Players.objects.filter(gender=gender):
+        players.setdefault(player.position_id, []).append(player)
+    positions = reference.all_rows(models.PlayerPosition)
+    return serializers.PlayerPosiotionListSerializer(positions, many=True, context={'players': players}).data
+
+
 class PlayerManListApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='player_list_cache'))
+    query_budget = 2
+
+    @method_decorator(cache_response(models.Players, models.PlayerPosition, key_prefix='player_man_list_cache'))
     def get(self, request):
-        players = models.PlayerPosition.objects.prefetch_related(Prefetch('players', queryset=models.Players.objects.filter(gender=models.MAN))).order_by('created_at')
-        serializer = serializers.PlayerPosiotionListSerializer(players, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(_players_by_position(models.MAN), status=status.HTTP_200_OK)
 
 
 class PlayerWomanListApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='player_list_cache'))
+    query_budget = 2
+
+    @method_decorator(cache_response(models.Players, models.PlayerPosition, key_prefix='player_woman_list_cache'))
     def get(self, request):
-        players = models.PlayerPosition.objects.prefetch_related(Prefetch('players', queryset=models.Players.objects.filter(gender=models.WOMEN))).order_by('created_at')
-        serializer = serializers.PlayerPosiotionListSerializer(players, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(_players_by_position(models.WOMEN), status=status.HTTP_200_OK)
     
 
 class PlayerU19ListApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='player_list_cache'))
+    query_budget = 2
+
+    @method_decorator(cache_response(models.Players, models.PlayerPosition, key_prefix='player_u19_list_cache'))
     def get(self, request):
-        players = models.PlayerPosition.objects.prefetch_related(Prefetch('players', queryset=models.Players.objects.filter(gender=models.U19))).order_by('created_at')
-        serializer = serializers.PlayerPosiotionListSerializer(players, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(_players_by_position(models.U19), status=status.HTTP_200_OK)
     
 class PlayerU21ListApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='player_list_cache'))
+    query_budget = 2
+
+    @method_decorator(cache_response(models.Players, models.PlayerPosition, key_prefix='player_u21_list_cache'))
     def get(self, request):
-        players = models.PlayerPosition.objects.prefetch_related(Prefetch('players', queryset=models.Players.objects.filter(gender=models.U21))).order_by('created_at')
-        serializer = serializers.PlayerPosiotionListSerializer(players, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(_players_by_position(models.U21), status=status.HTTP_200_OK)
     
 
+class PlayerRosterApiView(APIView):
+    # one more while this worker's reference cache of positions is cold
+    query_budget = 2
+
+    @method_decorator(cache_response(models.Players, models.PlayerPosition, key_prefix='player_roster_cache'))
+    def get(self, request):
+        squad = request.query_params.get('squad')
+        squads = squad.split(',') if squad else list(models.SQUADS)
+        unknown = [name for name in squads if name not in models.SQUADS]
+        if unknown:
+            return Response({'error': f'Unknown squad: {", ".join(unknown)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        players = models.Players.objects.filter(
+            gender__in=[models.SQUADS[name] for name in squads]
+        ).order_by('-created_at')
+
+        squad_names = {gender: name for name, gender in models.SQUADS.items()}
+        grouped = {}
+        for player in players:
+            key = (squad_names[player.gender], player.position_id)
+            grouped.setdefault(key, []).append(serializers.PlayerListSerializer(player).data)
+        positions = reference.all_rows(models.PlayerPosition)
+        roster = {
+            name: [
+                {**serializers.PlayerPositionSerializer(position).data, 'players': grouped[name, position.pk]}
+                for position in positions if (name, position.pk) in grouped
+            ]
+            for name in squads
+        }
+        return Response(roster, status=status.HTTP_200_OK)
+
+
 class PlayerDetailApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='player_detail_cache'))
+    # position and country come from the reference cache, each a query only when cold
+    query_budget = 3
+
+    @method_decorator(cache_response(models.Players, models.PlayerPosition, models.PlayerCountry, key_prefix='player_detail_cache'))
     def get(self, request, id):
-        player = models.Players.objects.select_related('position', 'country').filter(id=id).first()
+        player = models.Players.objects.filter(id=id).first()
         if not player:
             return Response({'error': 'Player not found'}, status=status.HTTP_404_NOT_FOUND)
         serializer = serializers.PlayerDetailSerializer(player)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 
+class PlayerLeaderboardApiView(APIView):
+    # the read after a Redis flush also rebuilds the boards from the database
+    query_budget = 2
+
+    @method_decorator(cache_response(models.Players, key_prefix='player_leaderboard_cache'))
+    def get(self, request):
+        stat = request.query_params.get('stat', 'goals')
+        squad = request.query_params.get('squad', leaderboard.ALL)
+        if stat not in leaderboard.STATS:
+            return Response({'error': f'Unknown stat: {stat}'}, status=status.HTTP_400_BAD_REQUEST)
+        if squad != leaderboard.ALL and squad not in models.SQUADS:
+            return Response({'error': f'Unknown squad: {squad}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), settings.LEADERBOARD_MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ranking = leaderboard.top(stat, squad, limit)
+        players = {str(pk): player for pk, player in models.Players.objects.in_bulk([pk for pk, score in ranking]).items()}
+        data = [
+            {'rank': rank, 'value': int(score) if score.is_integer() else round(score, 2), 'player': serializers.PlayerListSerializer(players[pk]).data}
+            for rank, (pk, score) in enumerate(ranking, start=1) if pk in players
+        ]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class AutocompleteApiView(APIView):
+    # answered from Redis alone, so keystroke-rate traffic never reaches Postgres
+    authentication_classes = []
+    permission_classes = []
+    query_budget = 0
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', settings.AUTOCOMPLETE_LIMIT)), settings.AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+        data = autocomplete.suggest(request.query_params.get('q', ''), limit, request)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class MatchNextApiView(APIView):
+    query_budget = 1
+
+    # the next match also changes with the clock, not only with new PFL data
+    @method_decorator(cache_response(
+        models.Match, timeout=settings.MATCH_CACHE_TIMEOUT, time_bucket=settings.MATCH_CACHE_TIMEOUT,
+        key_prefix='match_next_cache',
+    ))
+    def get(self, request):
+        match = matches.next_match()
+        if match is None:
+            return Response({'error': 'No upcoming match'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serializers.MatchSerializer(match).data, status=status.HTTP_200_OK)
+
+
+class MatchResultsApiView(APIView):
+    query_budget = 1
+
+    @method_decorator(cache_response(models.Match, key_prefix='match_results_cache'))
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 5)), settings.MATCH_RESULTS_MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({'error': 'limit must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = serializers.MatchSerializer(matches.last_results(limit), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class MatchListApiView(APIView):
+    query_budget = 1
+
+    @method_decorator(cache_response(models.Match, key_prefix='match_list_cache'))
+    def get(self, request):
+        params = request.query_params
+        queryset = models.Match.objects.order_by('kickoff')
+        date_from, date_to = parse_date(params.get('date_from', '')), parse_date(params.get('date_to', ''))
+        if params.get('date_from') and date_from is None or params.get('date_to') and date_to is None:
+            return Response({'error': 'dates must look like YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from:
+            queryset = queryset.filter(kickoff__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(kickoff__lt=date_to + timedelta(days=1))
+        # without a date range the current season is listed
+        season = params.get('season') or (None if date_from or date_to else settings.PFL_SEASON_ID)
+        if season is not None:
+            if not str(season).isdigit():
+                return Response({'error': 'season must be a PFL season id'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(season_id=season)
+        serializer = serializers.MatchSerializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class PartnerListApiView(APIView):
-    # @method_decorator(cache_page(2*60, key_prefix='partner_list_cache'))
+    @method_decorator(cache_response(models.Partners, key_prefix='partner_list_cache'))
     def get(self, request):
         queryset = models.Partners.objects.all().order_by('created_at')
         serializer = serializers.PartnerLogoListSerializer(queryset, many=True)
@@ -107,9 +264,9 @@ class PartnerListApiView(APIView):
 class AboutCompanyApiView(ListAPIView):
     serializer_class = serializers.AboutCompanySerializer
 
-    # @method_decorator(cache_page(2*60, key_prefix='about_company_list_cache'))
+    @method_decorator(cache_response(models.AboutCompany, key_prefix='about_company_list_cache'))
     def list(self, request, *args, **kwargs):   
-        queryset = models.AboutCompany.objects.all().order_by('created_at')
+        queryset = localization.defer_unused(models.AboutCompany.objects.all().order_by('created_at'))
         serializer = serializers.AboutCompanySerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -117,9 +274,9 @@ class AboutCompanyApiView(ListAPIView):
 class StadiumListApiView(ListAPIView):
     serializer_class = serializers.StadiumSerializer
 
-    # @method_decorator(cache_page(2*60, key_prefix='stadium_list_cache'))
+    @method_decorator(cache_response(models.Stadium, key_prefix='stadium_list_cache'))
     def list(self, request, *args, **kwargs):
-        queryset = models.Stadium.objects.all().order_by('created_at')
+        queryset = localization.defer_unused(models.Stadium.objects.all().order_by('created_at'))
         serializer = serializers.StadiumSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -127,9 +284,9 @@ class StadiumListApiView(ListAPIView):
 class BannerListApiView(ListAPIView):
     serializer_class = serializers.BannerListSerializer
 
-    # @method_decorator(cache_page(2*60, key_prefix='banner_list_cache'))
+    @method_decorator(cache_response(models.Banner, key_prefix='banner_list_cache'))
     def list(self, request, *args, **kwargs):
-        queryset = models.Banner.objects.all().order_by('created_at')
+        queryset = localization.defer_unused(models.Banner.objects.all().order_by('created_at'))
         serializer = serializers.BannerListSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -137,9 +294,9 @@ class BannerListApiView(ListAPIView):
 class AboutAcademyApiView(ListAPIView):
     serializer_class = serializers.AboutAcademySerializer
     
-    # @method_decorator(cache_page(2*60, key_prefix='about_academy_list_cache'))
+    @method_decorator(cache_response(models.AboutAcademy, key_prefix='about_academy_list_cache'))
     def list(self, request, *args, **kwargs):
-        data = models.AboutAcademy.objects.all().order_by('created_at')
+        data = localization.defer_unused(models.AboutAcademy.objects.all().order_by('created_at'))
         serializer = serializers.AboutAcademySerializer(data, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -147,113 +304,76 @@ class AboutAcademyApiView(ListAPIView):
 class CoachListManApiView(ListAPIView):
     serializer_class = serializers.CoachListSerializer
     queryset = models.Coach.objects.filter(gender=models.MAN, coach_type=models.TEAM_COACH).only(
-        'id', 'full_name', 'image', 'position_id'
-    ).select_related('position').order_by('created_at')
+        'id', 'full_name', 'image', 'derivatives', 'position_id'
+    ).order_by('created_at')
 
-    # @method_decorator(cache_page(2*60, key_prefix='coach_list_man_cache'))
+    @method_decorator(cache_response(models.Coach, models.CoachPosition, key_prefix='coach_list_man_cache'))
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        serializer = serializers.CoachListValuesSerializer(self.get_queryset(), context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
     
 
 class CoachListWomenApiView(ListAPIView):
     serializer_class = serializers.CoachListSerializer
     queryset = models.Coach.objects.filter(gender=models.WOMEN, coach_type=models.TEAM_COACH).only(
-        'id', 'full_name', 'image', 'position_id'
-    ).select_related('position').order_by('created_at')
+        'id', 'full_name', 'image', 'derivatives', 'position_id'
+    ).order_by('created_at')
 
-    # @method_decorator(cache_page(2*60, key_prefix='coach_list_woman_cache'))
+    @method_decorator(cache_response(models.Coach, models.CoachPosition, key_prefix='coach_list_woman_cache'))
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        serializer = serializers.CoachListValuesSerializer(self.get_queryset(), context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
     
 
 class CoachDetailApiView(RetrieveAPIView):
     serializer_class = serializers.CoachDetailSerializer
-    queryset = models.Coach.objects.select_related('position').order_by('created_at')
+    # one more while this worker's reference cache of positions is cold
+    query_budget = 3
+    queryset = models.Coach.objects.order_by('created_at')
     lookup_field = 'id'
 
-    # @method_decorator(cache_page(2*60, key_prefix='coach_detail_cache'))
+    def get_queryset(self):
+        return localization.defer_unused(super().get_queryset())
+
+    @method_decorator(cache_response(models.Coach, models.CoachPosition, models.CoachInformation, key_prefix='coach_detail_cache'))
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
     
 
 class CoachTableListManApiView(ListAPIView):
     serializer_class = serializers.CoachTableListSerializer
-    queryset = models.Coach.objects.filter(gender=models.MAN).only('id', 'full_name', 'position_id').select_related('position').order_by('created_at')
+    queryset = models.Coach.objects.filter(gender=models.MAN).only('id', 'full_name', 'position_id').order_by('created_at')
 
-    # @method_decorator(cache_page(2*60, key_prefix='coach_table_list_cache'))
+    @method_decorator(cache_response(models.Coach, models.CoachPosition, key_prefix='coach_table_list_man_cache'))
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        serializer = serializers.CoachTableListValuesSerializer(self.get_queryset(), context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
     
 
 
 class CoachTableListWomenApiView(ListAPIView):
     serializer_class = serializers.CoachTableListSerializer
-    queryset = models.Coach.objects.filter(gender=models.WOMEN).only('id', 'full_name', 'position_id').select_related('position').order_by('created_at')
+    queryset = models.Coach.objects.filter(gender=models.WOMEN).only('id', 'full_name', 'position_id').order_by('created_at')
 
-    # @method_decorator(cache_page(2*60, key_prefix='coach_table_list_cache'))
+    @method_decorator(cache_response(models.Coach, models.CoachPosition, key_prefix='coach_table_list_women_cache'))
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        serializer = serializers.CoachTableListValuesSerializer(self.get_queryset(), context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
     
 
 class CoachAcademyListApiView(ListAPIView):
     serializer_class = serializers.CoachListSerializer
-    queryset = models.Coach.objects.filter(coach_type=models.ACADEMY_COACH).select_related('position').order_by('created_at')
+    queryset = models.Coach.objects.filter(coach_type=models.ACADEMY_COACH).order_by('created_at')
 
-    # @method_decorator(cache_page(2*60, key_prefix='coach_academy_list_cache'))
+    @method_decorator(cache_response(models.Coach, models.CoachPosition, key_prefix='coach_academy_list_cache'))
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        serializer = serializers.CoachListValuesSerializer(self.get_queryset(), context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_200_OK)
     
 class LeaderListApiView(ListAPIView):
     serializer_class = serializers.LeaderListSerializer
     queryset = models.Leaders.objects.order_by('created_at')
 
-    # @method_decorator(cache_page(2*60, key_prefix='leader_list_cache'))
+    @method_decorator(cache_response(models.Leaders, key_prefix='leader_list_cache'))
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
-    
-
-class SearchApiView(GenericAPIView):   
-    serializer_class = serializers.SearchSerializer
-
-    def post(self, request):
-        serializer = serializers.SearchSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        news = models.News.objects.filter(title__icontains=serializer.validated_data['search'])[:5]
-        players = models.Players.objects.filter(full_name__icontains=serializer.validated_data['search'])[:5]
-        coaches = models.Coach.objects.filter(full_name__icontains=serializer.validated_data['search'])[:5]
-        leaders = models.Leaders.objects.filter(full_name__icontains=serializer.validated_data['search'])[:5]
-        data = {
-            "news": serializers.NewsSerializer(news, many=True).data,  
-            "players": serializers.PlayerListSerializer(players, many=True).data,
-            "coaches": serializers.CoachListSerializer(coaches, many=True).data,
-            "leaders": serializers.LeaderListSerializer(leaders, many=True).data,
-        }
-        return Response(data, status=status.HTTP_200_OK)
-
-
-class GetTableApiView(APIView):
-    # @method_decorator(cache_page(5*60))
-    def get(self, request):
-        r = requests.get(
-            "https://api.pfl.uz/v1/web/game/table"
-        )
-        if r.status_code == 200:
-            data = r.json()
-            table_data = data.get("data", {}).get("table", [])  
-            return Response(table_data)
-        return Response({"message": "bad request"})
-
-
-class TableApiView(APIView):
-    def get(self, request):
-        r = requests.get(
-            "https://api.pfl.uz/v1/web/game/calendar?tournamentId=1&seasonId=10&clubId=23"
-        )
-        if r.status_code == 200:
-            data = r.json().get("data", {}).get("table", [])
-
-            return Response(data)
-
-        return Response({"message": "Bad request"})
-    
-
@@ -1,8 +1,20 @@
 import os
 from celery import Celery
+from celery.signals import worker_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 celery = Celery('core')
 celery.config_from_object('django.conf:settings', namespace='CELERY')
-celery.autodiscover_tasks()
\ No newline at end of file
+celery.autodiscover_tasks()
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    # PFL refreshes run here, not in the web workers; the pool processes write to
+    # PROMETHEUS_MULTIPROC_DIR and the main process serves their sum
+    from django.conf import settings
+    from common.metrics import start_exporter
+
+    if settings.PROMETHEUS_WORKER_PORT:
+        start_exporter(settings.PROMETHEUS_WORKER_PORT)
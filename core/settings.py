@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # packages 
     'drf_yasg',
     'rest_framework',
@@ -38,9 +39,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.middleware.ServerTimingMiddleware',
+    'common.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
+    'common.middleware.RequestLanguageMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,6 +90,21 @@ DATABASES = {
     }
 }
 
+# read replicas as DB_REPLICAS="host:port,host:port", with the primary's name and credentials
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICAS', '').replace(' ', '').split(',')), start=1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'], 'HOST': host, 'PORT': port or DATABASES['default']['PORT'], 'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['common.routers.ReplicaRouter']
+# safe requests under this prefix read from a replica
+REPLICA_READ_PREFIX = '/api/v1/common/'
+# the replication lag we allow for: a writer's reads, and reads of a just changed model, stay on the primary this long
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -126,6 +145,19 @@ STATIC_ROOT = BASE_DIR / 'static'
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# behind nginx, media responses only carry X-Accel-Redirect to this internal location;
+# set MEDIA_ACCEL_REDIRECT=False when running runserver without nginx
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', default='True') == 'True'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# pre-rendered JSON of rarely changing endpoints, served by nginx (see common/publish.py)
+PUBLISH_ROOT = BASE_DIR / 'published'
+# absolute media URLs in published files are built against this host
+PUBLISH_BASE_URL = os.getenv('PUBLISH_BASE_URL', default="https://api.xorazmfc.uz")
+
+# widths of the resized copies generated for every uploaded image
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+IMAGE_DERIVATIVE_QUALITY = 80
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -158,8 +190,8 @@ MODELTRANSLATION_DEFAULT_LANGUAGE = 'uz'
 
 CACHES = {
     "default": {
-        'BACKEND': "django_redis.cache.RedisCache",
-        'LOCATION': "redis://redis_db:6379/1",
+        'BACKEND': "common.instrumentation.InstrumentedRedisCache",
+        'LOCATION': os.getenv('REDIS_URL', default="redis://redis_db:6379/1"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "CONNECTION_POOL_KWARGS": {"max_connections": 100},
@@ -167,12 +199,112 @@ CACHES = {
     }
 }
 
+# responses are invalidated by model version counters, so they can live long
+CACHE_RESPONSE_TIMEOUT = 24*60*60
+# a missed cache key is rebuilt by the one worker holding a Redis lock for at most SINGLEFLIGHT_LEASE seconds;
+# the others serve the previous value, or poll for the new one for up to SINGLEFLIGHT_WAIT seconds
+SINGLEFLIGHT_LEASE = 10
+SINGLEFLIGHT_WAIT = 1
+SINGLEFLIGHT_POLL_INTERVAL = 0.05
+
 CELERY_BROKER_URL ='redis://redis_db:6379/2'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
-# INTERNAL_IPS = [
-#     "127.0.0.1",
-# ]
+PFL_BASE_URL = os.getenv('PFL_BASE_URL', default="https://api.pfl.uz")
+# the competition, season and club whose calendar is mirrored into common.Match
+PFL_TOURNAMENT_ID = int(os.getenv('PFL_TOURNAMENT_ID', default=1))
+PFL_SEASON_ID = int(os.getenv('PFL_SEASON_ID', default=10))
+PFL_CLUB_ID = int(os.getenv('PFL_CLUB_ID', default=23))
+PFL_CALENDAR_PATH = "/v1/web/game/calendar"
+PFL_PATHS = {
+    'table': "/v1/web/game/table",
+    'calendar': f"{PFL_CALENDAR_PATH}?tournamentId={PFL_TOURNAMENT_ID}&seasonId={PFL_SEASON_ID}&clubId={PFL_CLUB_ID}",
+}
+PFL_CONNECT_TIMEOUT = 3
+PFL_READ_TIMEOUT = 10
+PFL_RETRIES = 2
+# after this many failed calls in a row nobody calls PFL until the reset timeout passes
+PFL_CIRCUIT_FAILURE_THRESHOLD = 5
+PFL_CIRCUIT_RESET_TIMEOUT = 60
+# snapshots older than this are still served, but trigger a background refresh
+PFL_REFRESH_INTERVALS = {
+    'table': 5*60,
+    'calendar': 10*60,
+}
+PFL_REFRESH_LOCK_TIMEOUT = 60
+
+# queries a view may run per request before a warning is logged, a view can set its own `query_budget`
+QUERY_BUDGET_DEFAULT = 10
+# common.tests turns this on so an exceeded budget fails the request instead of only logging
+QUERY_BUDGET_RAISE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # one JSON line per request with phase timings and counts
+        'common.instrumentation': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# goals per match only ranks players with at least this many matches
+LEADERBOARD_MIN_MATCHES = 1
+LEADERBOARD_MAX_LIMIT = 50
+
+# prefix autocomplete kept in Redis, see common/autocomplete.py
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 20
+AUTOCOMPLETE_MIN_LENGTH = 2
+
+# categories, positions and countries kept in each worker's memory, see common/reference.py;
+# edits reach other workers through Redis pub/sub, the timeout covers a missed message
+REFERENCE_CACHE_SIZE = 16
+REFERENCE_MAX_ROWS = 500
+REFERENCE_CACHE_TIMEOUT = 5*60
+REFERENCE_LISTENER_RETRY = 5
+
+# search results are cached per normalized query and language until a searched model changes;
+# browsers and nginx may reuse a GET answer for SEARCH_CACHE_MAX_AGE seconds
+SEARCH_CACHE_TIMEOUT = 24*60*60
+SEARCH_CACHE_MAX_AGE = 60
+# this long after content changes the SEARCH_PREWARM_COUNT most searched queries are cached again,
+# out of the SEARCH_POPULAR_SIZE kept in the popularity set
+SEARCH_PREWARM_DELAY = 30
+SEARCH_PREWARM_COUNT = 50
+SEARCH_POPULAR_SIZE = 1000
+
+# an unfinished match stays the next match this long after kickoff
+MATCH_DURATION_HOURS = 3
+MATCH_RESULTS_MAX_LIMIT = 20
+# answers that depend on the clock, like the next match, are recomputed at least this often
+MATCH_CACHE_TIMEOUT = 60
+
+HOME_NEWS_LIMIT = 6
+# fragments not built within this many seconds are returned empty and marked stale
+HOME_FRAGMENT_TIMEOUT = 2
+
+CELERY_BEAT_SCHEDULE = {
+    'refresh-pfl-table': {
+        'task': 'common.tasks.refresh_pfl_snapshot',
+        'schedule': PFL_REFRESH_INTERVALS['table'],
+        'args': ('table',),
+    },
+    'refresh-pfl-calendar': {
+        'task': 'common.tasks.refresh_pfl_snapshot',
+        'schedule': PFL_REFRESH_INTERVALS['calendar'],
+        'args': ('calendar',),
+    },
+}
+
+# the Celery worker serves /metrics on this port, 0 turns it off
+PROMETHEUS_WORKER_PORT = int(os.getenv('PROMETHEUS_WORKER_PORT', default=0))
+
+# the only clients that get the Server-Timing header, matched on REMOTE_ADDR, e.g. 127.0.0.1 in development;
+# never list nginx, every proxied request comes from it
+INTERNAL_IPS = [ip for ip in os.getenv('INTERNAL_IPS', default='').split(',') if ip]
 
 JAZZMIN_SETTINGS = {
     "language_chooser": True,
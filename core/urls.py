@@ -1,5 +1,5 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings 
 from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
@@ -8,6 +8,9 @@ from django.conf.urls.i18n import i18n_patterns
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 
+from common.media import serve_media
+from common.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="API Documentation",
@@ -28,9 +31,11 @@ urlpatterns = [
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
     path('api/v1/common/', include('common.urls')),
+    path('metrics/', metrics_view),
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# uploads go through serve_media, which hands the transfer to nginx
+urlpatterns += [re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', serve_media)]
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 # if settings.DEBUG: